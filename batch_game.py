@@ -0,0 +1,418 @@
+import copy
+from typing import List, Dict, Tuple, Optional
+
+import numpy as np
+from numpy import ndarray
+from numpy.random import Generator
+
+from game import Game
+from game_episode import GameEpisode
+from game_result import GameResult
+from game_snapshot import GameSnapshot
+from move_generator import MoveGenerator
+from state_parser import StateParser
+
+
+class BatchGame:
+    Players = [Game.NaturePlayer, Game.BluePlayer, Game.RedPlayer]
+    ZobristTable = np.array(Game.ZobristKeys, dtype=np.uint64)
+    TileRange = np.arange(Game.MapSize)
+
+    def __init__(self, game: Game, size: int):
+        self.game = game
+        self.size = size
+        self.map_owners = None  # type: ndarray
+        self.map_troops = None  # type: ndarray
+        self.player_id = None
+        self.rounds = None  # type: ndarray
+        self.skipped_rounds = None  # type: ndarray
+        self.active = None  # type: ndarray
+        self.production_moves = None  # type: ndarray
+        self.attack_moves = None  # type: ndarray
+        self.transport_moves = None  # type: ndarray
+        self.guided_moves = None  # type: ndarray
+        self.state_hashes = None  # type: ndarray
+        self.state_counts = None  # type: List[Dict[int, int]]
+        self.randoms = None  # type: List[Generator]
+        self.red_start_tiles = None  # type: ndarray
+        self.red_start_troops = None  # type: ndarray
+        self.episodes = None  # type: List[GameEpisode]
+        self.move_rewards = None  # type: List[Tuple[int, ndarray]]
+        self.resumed_rewards = None  # type: List[List[List[float]]]
+        self.reset_game()
+
+    def reset_game(self, episodes: Optional[List[GameEpisode]] = None) -> None:
+        self.game.reset_game(create_game_map=self.game.game_map is None)
+
+        if self.map_owners is None:
+            self.map_owners = np.tile(self.game.map_owners, (self.size, 1))
+            self.map_troops = np.tile(self.game.map_troops, (self.size, 1))
+            self.rounds = np.zeros(self.size, dtype=int)
+            self.skipped_rounds = np.zeros(self.size, dtype=int)
+            self.active = np.ones(self.size, dtype=bool)
+            self.production_moves = np.zeros((self.size, len(BatchGame.Players)), dtype=int)
+            self.attack_moves = np.zeros((self.size, len(BatchGame.Players)), dtype=int)
+            self.transport_moves = np.zeros((self.size, len(BatchGame.Players)), dtype=int)
+            self.guided_moves = np.zeros((self.size, len(BatchGame.Players)), dtype=int)
+            self.randoms = [copy.deepcopy(self.game.random) for _ in range(self.size)]
+            self.red_start_tiles = np.zeros(self.size, dtype=int)
+            self.red_start_troops = np.zeros(self.size, dtype=int)
+        else:
+            self.map_owners[:] = self.game.map_owners
+            self.map_troops[:] = self.game.map_troops
+            self.rounds.fill(0)
+            self.skipped_rounds.fill(0)
+            self.active.fill(True)
+            self.production_moves.fill(0)
+            self.attack_moves.fill(0)
+            self.transport_moves.fill(0)
+            self.guided_moves.fill(0)
+
+            for random in self.randoms:
+                random.bit_generator.state = self.game.random.bit_generator.state
+
+        self.red_start_tiles.fill(self.game.red_start_tiles)
+        self.red_start_troops.fill(self.game.red_start_troops)
+        self.episodes = [self.game.start_episode] * self.size
+
+        # Every game may start from its own episode instead of the default board.
+        if episodes is not None:
+            for index, episode in enumerate(episodes):
+                self.map_owners[index] = episode.map_owners
+                self.map_troops[index] = episode.map_troops
+                self.randoms[index].bit_generator.state = episode.random_state
+                self.red_start_tiles[index] = episode.red_tiles
+                self.red_start_troops[index] = episode.red_troops
+                self.episodes[index] = episode
+
+        self.player_id = Game.RedPlayer
+        self.state_hashes = self.create_state_hashes()
+        self.state_counts = [{} for _ in range(self.size)]
+        self.move_rewards = []
+        self.resumed_rewards = None
+
+    def get_snapshot(self, index: int, stop_counters: Optional[Tuple[int, int, int, int]], stop_stalls: int,
+                     paused: bool) -> GameSnapshot:
+        return self.get_game(index).get_snapshot(stop_counters, stop_stalls, paused)
+
+    def load_snapshots(self, snapshots: List[GameSnapshot]) -> None:
+        for index, snapshot in enumerate(snapshots):
+            self.map_owners[index] = snapshot.map_owners
+            self.map_troops[index] = snapshot.map_troops
+            self.rounds[index] = snapshot.rounds
+            # Only paused games continue, the others already have their final result.
+            self.skipped_rounds[index] = 0 if snapshot.paused else snapshot.skipped_rounds
+            self.active[index] = snapshot.paused
+            self.production_moves[index] = snapshot.player_moves[:, 0]
+            self.attack_moves[index] = snapshot.player_moves[:, 1]
+            self.transport_moves[index] = snapshot.player_moves[:, 2]
+            self.guided_moves[index] = snapshot.player_moves[:, 3]
+            self.state_counts[index] = dict(snapshot.state_counts)
+            self.randoms[index].bit_generator.state = snapshot.random_state
+
+        self.state_hashes = self.create_state_hashes()
+        self.resumed_rewards = [snapshot.per_move_fitness for snapshot in snapshots]
+
+    def get_game(self, index: int) -> Game:
+        game = self.game
+        game.load_board(self.map_owners[index], self.map_troops[index])
+        game.player_id = self.player_id
+        game.rounds = int(self.rounds[index])
+        game.skipped_rounds = int(self.skipped_rounds[index])
+        game.state_counts = self.state_counts[index]
+        game.random = self.randoms[index]
+        game.red_start_tiles = int(self.red_start_tiles[index])
+        game.red_start_troops = int(self.red_start_troops[index])
+        game.start_episode = self.episodes[index]
+
+        for player_id in BatchGame.Players:
+            player = game.get_player(player_id)
+            player.production_moves = int(self.production_moves[index, player_id])
+            player.attack_moves = int(self.attack_moves[index, player_id])
+            player.transport_moves = int(self.transport_moves[index, player_id])
+            player.guided_moves = int(self.guided_moves[index, player_id])
+            player.per_move_fitness = (list(self.resumed_rewards[index][player_id]) if self.resumed_rewards is not None else []) + [
+                float(rewards[index]) for reward_player_id, rewards in self.move_rewards
+                if reward_player_id == player_id and not np.isnan(rewards[index])
+            ]
+
+        return game
+
+    def increase_round(self) -> None:
+        self.rounds[self.active] += 1
+
+    def get_tile_counts(self, player_id: int) -> ndarray:
+        return np.count_nonzero(self.map_owners == player_id, axis=1)
+
+    def get_troop_counts(self, player_id: int) -> ndarray:
+        return np.where(self.map_owners == player_id, self.map_troops, 0).sum(axis=1)
+
+    def get_inputs(self) -> ndarray:
+        signs = np.zeros(self.map_owners.shape, dtype=int)
+        signs[self.map_owners == Game.BluePlayer] = 1
+        signs[self.map_owners == Game.RedPlayer] = -1
+        return (signs * self.map_troops) / Game.TileTroopMax
+
+    def create_state_hashes(self) -> ndarray:
+        values = np.where(self.map_owners == Game.BluePlayer, self.map_troops, -self.map_troops)
+        keys = BatchGame.ZobristTable[BatchGame.TileRange, values + Game.TileTroopMax]
+        return np.bitwise_xor.reduce(keys, axis=1)
+
+    def save_state(self) -> None:
+        self.state_hashes = self.create_state_hashes()
+
+        for index in np.flatnonzero(self.active):
+            state_counts = self.state_counts[index]
+            state_hash = int(self.state_hashes[index])
+            state_counts[state_hash] = state_counts.get(state_hash, 0) + 1
+
+    def is_state_repeated(self) -> ndarray:
+        repeats = [
+            state_counts.get(int(state_hash), 0) - 1
+            for state_counts, state_hash in zip(self.state_counts, self.state_hashes)
+        ]
+
+        return np.array(repeats) >= 3
+
+    def get_rows(self) -> ndarray:
+        return np.arange(self.size)
+
+    def is_production_move_valid(self, sources: ndarray) -> ndarray:
+        rows = self.get_rows()
+
+        return (self.map_owners[rows, sources] == self.player_id) \
+               & (self.map_troops[rows, sources] < Game.TileTroopMax)
+
+    def is_attack_move_valid(self, sources: ndarray, targets: ndarray, attackers: ndarray) -> ndarray:
+        rows = self.get_rows()
+
+        return (self.map_owners[rows, sources] == self.player_id) \
+               & (self.map_owners[rows, targets] != self.player_id) \
+               & Game.TileAdjMatrix[sources, targets] \
+               & (attackers >= Game.TileTroopMin) & (attackers <= Game.TileTroopMax) \
+               & (self.map_troops[rows, sources] >= attackers)
+
+    def is_transport_move_valid(self, sources: ndarray, targets: ndarray, transport: ndarray) -> ndarray:
+        rows = self.get_rows()
+
+        return (self.map_owners[rows, sources] == self.player_id) \
+               & (self.map_owners[rows, targets] == self.player_id) \
+               & Game.TileReachMatrix[sources, targets] \
+               & (transport >= Game.TileTroopMin) & (transport <= Game.TileTroopMax) \
+               & (self.map_troops[rows, sources] >= transport) \
+               & (self.map_troops[rows, targets] + transport <= Game.TileTroopMax)
+
+    def production_move(self, mask: ndarray, sources: ndarray) -> None:
+        rows = np.flatnonzero(mask)
+        sources = sources[rows]
+
+        self.map_troops[rows, sources] += 1
+
+        self.production_moves[rows, self.player_id] += 1
+
+    def attack_move(self, mask: ndarray, sources: ndarray, targets: ndarray, attackers: ndarray) -> None:
+        rows = np.flatnonzero(mask)
+        sources = sources[rows]
+        targets = targets[rows]
+        attackers = attackers[rows]
+
+        source_troops = self.map_troops[rows, sources].astype(int) - attackers
+        self.map_owners[rows, sources] = np.where(
+            source_troops < Game.TileTroopMin, Game.NaturePlayer, self.map_owners[rows, sources]
+        )
+        self.map_troops[rows, sources] = source_troops
+
+        defenders = self.map_troops[rows, targets].astype(int)
+        target_owners = np.where(defenders < attackers, self.player_id, self.map_owners[rows, targets])
+        target_troops = np.abs(defenders - attackers)
+        target_owners[target_troops < Game.TileTroopMin] = Game.NaturePlayer
+        self.map_owners[rows, targets] = target_owners
+        self.map_troops[rows, targets] = target_troops
+
+        self.attack_moves[rows, self.player_id] += 1
+
+    def transport_move(self, mask: ndarray, sources: ndarray, targets: ndarray, transport: ndarray) -> None:
+        rows = np.flatnonzero(mask)
+        sources = sources[rows]
+        targets = targets[rows]
+        transport = transport[rows]
+
+        source_troops = self.map_troops[rows, sources].astype(int) - transport
+        self.map_owners[rows, sources] = np.where(
+            source_troops < Game.TileTroopMin, Game.NaturePlayer, self.map_owners[rows, sources]
+        )
+        self.map_troops[rows, sources] = source_troops
+        self.map_troops[rows, targets] += transport.astype(np.int8)
+
+        self.transport_moves[rows, self.player_id] += 1
+
+    def get_move_deltas(self, move_types: ndarray, sources: ndarray, targets: ndarray, troops: ndarray) -> ndarray:
+        rows = self.get_rows()
+        enemy_id = Game.BluePlayer if self.player_id == Game.RedPlayer else Game.RedPlayer
+
+        source_troops = self.map_troops[rows, sources].astype(int)
+        defenders = self.map_troops[rows, targets].astype(int)
+        enemy_targets = self.map_owners[rows, targets] == enemy_id
+
+        production = move_types == Game.ProductionMove
+        attack = move_types == Game.AttackMove
+        transport = move_types == Game.TransportMove
+
+        lost = (attack | transport) & (source_troops - troops < Game.TileTroopMin)
+        captured = attack & (defenders < troops)
+
+        deltas = np.zeros((self.size, 4), dtype=int)
+        deltas[:, 0] = captured.astype(int) - lost
+        deltas[:, 1] = np.where(production, 1, np.where(attack, np.maximum(troops - defenders, 0) - troops, 0))
+        deltas[:, 2] = -(attack & enemy_targets & (defenders <= troops)).astype(int)
+        deltas[:, 3] = np.where(attack & enemy_targets, -np.minimum(defenders, troops), 0)
+
+        return deltas
+
+    def record_rewards(self, moves: List[ndarray]) -> None:
+        move_types, sources, targets, troops, guided = moves
+        deltas = self.get_move_deltas(move_types, sources, targets, troops)
+
+        rewards = np.full(self.size, np.nan)
+        rewards[self.active] = self.game.get_reward_table().get_rewards(deltas[self.active])
+        self.move_rewards.append((self.player_id, rewards))
+
+    def play_moves(self, move_types: ndarray, sources: ndarray, targets: ndarray, troops: ndarray,
+                   guided: ndarray = None) -> None:
+        self.production_move(self.active & (move_types == Game.ProductionMove), sources)
+        self.attack_move(self.active & (move_types == Game.AttackMove), sources, targets, troops)
+        self.transport_move(self.active & (move_types == Game.TransportMove), sources, targets, troops)
+
+        if guided is not None:
+            self.guided_moves[self.active & guided, self.player_id] += 1
+
+        self.save_state()
+
+    def create_moves(self) -> List[ndarray]:
+        return [
+            np.full(self.size, Game.IdleMove),
+            np.zeros(self.size, dtype=int),
+            np.zeros(self.size, dtype=int),
+            np.ones(self.size, dtype=int),
+            np.zeros(self.size, dtype=bool),
+        ]
+
+    def decode_moves(self, outputs: ndarray) -> List[ndarray]:
+        prod_flags, sources, targets, troops = StateParser.decode_states(outputs)
+
+        production = prod_flags & self.is_production_move_valid(sources)
+        attack = ~production & self.is_attack_move_valid(sources, targets, troops)
+        transport = ~production & ~attack & self.is_transport_move_valid(sources, targets, troops)
+
+        move_types = np.full(self.size, Game.IdleMove)
+        move_types[production] = Game.ProductionMove
+        move_types[attack] = Game.AttackMove
+        move_types[transport] = Game.TransportMove
+
+        return [move_types, sources, targets, troops, np.zeros(self.size, dtype=bool)]
+
+    def guide_moves(self, moves: List[ndarray]) -> None:
+        move_types, sources, targets, troops, guided = moves
+        rows = np.flatnonzero(self.active & (move_types == Game.IdleMove))
+
+        if len(rows) == 0:
+            return
+
+        legal_moves = [
+            StateParser.Moves.get_board_moves(int(self.state_hashes[index]), self.map_owners[index],
+                                              self.map_troops[index], self.player_id)
+            for index in rows
+        ]
+
+        nearest_moves = MoveGenerator.get_nearest_moves(legal_moves, sources[rows], targets[rows], troops[rows])
+
+        move_types[rows] = nearest_moves['move_type']
+        sources[rows] = nearest_moves['source']
+        targets[rows] = nearest_moves['target']
+        troops[rows] = nearest_moves['troops']
+        guided[rows] = True
+
+    def simulate_moves(self) -> List[ndarray]:
+        player_id = self.player_id
+        enemy_id = Game.RedPlayer if player_id == Game.BluePlayer else Game.BluePlayer
+
+        candidate_types = MoveGenerator.Candidates['move_type']
+        legal_moves = MoveGenerator.get_move_mask(self.map_owners, self.map_troops, player_id)
+        attack_moves = legal_moves & (candidate_types == Game.AttackMove)
+        production_moves = legal_moves & (candidate_types == Game.ProductionMove)
+
+        my_tiles = self.get_tile_counts(player_id)
+        my_troops = self.get_troop_counts(player_id)
+        enemy_tiles = self.get_tile_counts(enemy_id)
+        enemy_troops = self.get_troop_counts(enemy_id)
+
+        attack = (my_tiles < enemy_tiles) & attack_moves.any(axis=1)
+        production = ~attack & ((my_troops < Game.TileTroopMax) | (my_troops < enemy_troops)) \
+                     & production_moves.any(axis=1)
+
+        choices = np.where(attack[:, None], attack_moves, np.where(production[:, None], production_moves, legal_moves))
+        rows, columns = np.nonzero(choices)
+        counts = np.bincount(rows, minlength=self.size)
+        offsets = np.cumsum(counts) - counts
+        picks = np.zeros(self.size, dtype=int)
+
+        # Generator.choice draws its index with integers(0, n), so every game consumes its stream like the scalar game.
+        for index in np.flatnonzero(self.active):
+            picks[index] = self.randoms[index].integers(0, counts[index])
+
+        simulated_moves = MoveGenerator.Candidates[columns[np.minimum(offsets + picks, len(columns) - 1)]]
+
+        moves = self.create_moves()
+        move_types, sources, targets, troops, guided = moves
+        move_types[self.active] = simulated_moves['move_type'][self.active]
+        sources[:] = simulated_moves['source']
+        targets[:] = simulated_moves['target']
+        troops[:] = simulated_moves['troops']
+
+        return moves
+
+    def end_games(self) -> None:
+        self.active &= ~self.game.has_batch_ended(self)
+
+    def stop_games(self, stopped: ndarray) -> None:
+        stopped = self.active & stopped
+        self.skipped_rounds[stopped] = self.game.get_max_rounds() - self.rounds[stopped]
+        self.active &= ~stopped
+
+    def has_ended(self) -> bool:
+        return not self.active.any()
+
+    def get_winners(self) -> ndarray:
+        return self.game.get_batch_winner(self)
+
+    def get_fitness(self) -> ndarray:
+        return self.game.get_batch_fitness(self)
+
+    def get_results(self, genome_keys: List[int]) -> List[GameResult]:
+        winner_names = {Game.NaturePlayer: 'Tie', Game.BluePlayer: 'Blue', Game.RedPlayer: 'Red'}
+
+        # Results are read from the batch arrays directly, no game is rebuilt per row.
+        columns = {
+            'genome_key': genome_keys,
+            'rounds': self.rounds.tolist(),
+            'blue_tiles': self.get_tile_counts(Game.BluePlayer).tolist(),
+            'red_tiles': self.get_tile_counts(Game.RedPlayer).tolist(),
+            'blue_troops': self.get_troop_counts(Game.BluePlayer).tolist(),
+            'red_troops': self.get_troop_counts(Game.RedPlayer).tolist(),
+            'blue_production_moves': self.production_moves[:, Game.BluePlayer].tolist(),
+            'red_production_moves': self.production_moves[:, Game.RedPlayer].tolist(),
+            'blue_attack_moves': self.attack_moves[:, Game.BluePlayer].tolist(),
+            'red_attack_moves': self.attack_moves[:, Game.RedPlayer].tolist(),
+            'blue_transport_moves': self.transport_moves[:, Game.BluePlayer].tolist(),
+            'red_transport_moves': self.transport_moves[:, Game.RedPlayer].tolist(),
+            'blue_guided_moves': self.guided_moves[:, Game.BluePlayer].tolist(),
+            'red_guided_moves': self.guided_moves[:, Game.RedPlayer].tolist(),
+            'skipped_rounds': self.skipped_rounds.tolist(),
+            'fitness': self.get_fitness().tolist(),
+            'winner': [winner_names[winner] for winner in self.get_winners().tolist()],
+        }
+
+        return [
+            GameResult(game_json={field: values[index] for field, values in columns.items()})
+            for index in range(self.size)
+        ]
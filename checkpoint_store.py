@@ -0,0 +1,168 @@
+import gzip
+import hashlib
+import io
+import lzma
+import os
+import pickle
+import random
+import re
+from typing import Dict, List, Tuple, Any
+
+from neat import Population, Config, DefaultGenome
+from neat.reporting import BaseReporter
+
+from checkpoint_writer import CheckpointWriter, write_file, append_file
+
+
+class ManifestPickler(pickle.Pickler):
+    def __init__(self, file: io.BytesIO, store: 'CheckpointStore'):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.store = store
+        self.references = {}  # type: Dict[int, Tuple[str, int]]
+
+    def persistent_id(self, obj: Any):
+        # Genomes are stored once by content hash, the manifest only keeps their hashes.
+        if not isinstance(obj, DefaultGenome):
+            return None
+
+        # Equal copies, like the best genomes kept by the statistics reporter, must not become one object on load.
+        if id(obj) not in self.references:
+            self.references[id(obj)] = (self.store.put_object(obj), len(self.references))
+
+        return self.references[id(obj)]
+
+
+class ManifestUnpickler(pickle.Unpickler):
+    def __init__(self, file: io.BytesIO, store: 'CheckpointStore'):
+        super().__init__(file)
+        self.store = store
+        self.packs = {}  # type: Dict[str, Dict[str, bytes]]
+        self.objects = {}  # type: Dict[int, Any]
+
+    def persistent_load(self, reference: Tuple[str, int]):
+        object_hash, number = reference
+
+        # Species members and the population share the same genome objects, like in a Checkpointer pickle.
+        if number not in self.objects:
+            pack_name = self.store.index[object_hash]
+
+            if pack_name not in self.packs:
+                self.packs[pack_name] = self.store.load_pack(pack_name)
+
+            self.objects[number] = pickle.loads(self.packs[pack_name][object_hash])
+
+        return self.objects[number]
+
+
+class CheckpointStore(BaseReporter):
+    ManifestPattern = re.compile(r'checkpoint-(\d+)')
+
+    def __init__(self, folder: str, writer: CheckpointWriter = None):
+        self.folder = folder
+        self.writer = writer
+        self.packs_folder = f'{folder}/packs'
+        self.index_path = f'{folder}/index'
+        self.current_generation = None
+        self.index = {}  # type: Dict[str, str]
+        self.pending = {}  # type: Dict[str, bytes]
+
+        if not os.path.isdir(self.packs_folder):
+            os.makedirs(self.packs_folder)
+
+        self.load_index()
+
+    def __getstate__(self):
+        # The store is pickled with the species set reporters, the index is read back from disk instead.
+        state = self.__dict__.copy()
+        state['index'] = {}
+        state['pending'] = {}
+        state['writer'] = None
+        return state
+
+    def start_generation(self, generation):
+        self.current_generation = generation
+
+    def end_generation(self, config, population, species_set):
+        self.save_checkpoint(config, population, species_set, self.current_generation)
+
+    def get_manifest_path(self, generation: int) -> str:
+        return f'{self.folder}/checkpoint-{generation}'
+
+    def get_generations(self) -> List[int]:
+        matches = [CheckpointStore.ManifestPattern.fullmatch(name) for name in os.listdir(self.folder)]
+        return sorted(int(match.group(1)) for match in matches if match)
+
+    def load_index(self) -> None:
+        if not os.path.exists(self.index_path):
+            return
+
+        with open(self.index_path, 'r') as file:
+            for line in file:
+                # A line cut short by a crash has no newline yet, its pack is written again later.
+                if line.endswith('\n'):
+                    object_hash, pack_name = line.split()
+                    self.index[object_hash] = pack_name
+
+    def put_object(self, obj: Any) -> str:
+        data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        object_hash = hashlib.sha1(data).hexdigest()
+
+        if object_hash not in self.index:
+            self.pending[object_hash] = data
+
+        return object_hash
+
+    def load_pack(self, pack_name: str) -> Dict[str, bytes]:
+        with open(f'{self.packs_folder}/{pack_name}', 'rb') as file:
+            return pickle.loads(lzma.decompress(file.read()))
+
+    def write_manifest(self, generation: int, manifest: bytes, pack_name: str, pack: Dict[str, bytes]) -> None:
+        if len(pack) > 0:
+            # New objects of a checkpoint are compressed together, genomes share most of their structure.
+            data = lzma.compress(pickle.dumps(pack, protocol=pickle.HIGHEST_PROTOCOL))
+            write_file(f'{self.packs_folder}/{pack_name}', data)
+
+            # The index is only extended once the pack is on disk, so it never points at a missing pack.
+            lines = ''.join(f'{object_hash} {pack_name}\n' for object_hash in pack)
+            append_file(self.index_path, lines.encode())
+
+        write_file(self.get_manifest_path(generation), lzma.compress(manifest))
+
+    def save_manifest(self, checkpoint: tuple) -> None:
+        buffer = io.BytesIO()
+        ManifestPickler(buffer, self).dump(checkpoint)
+
+        pack, self.pending = self.pending, {}
+        pack_name = f'pack-{hashlib.sha1("".join(pack).encode()).hexdigest()}'
+        self.index.update((object_hash, pack_name) for object_hash in pack)
+
+        if self.writer is not None:
+            self.writer.submit(self.write_manifest, checkpoint[0], buffer.getvalue(), pack_name, pack)
+        else:
+            self.write_manifest(checkpoint[0], buffer.getvalue(), pack_name, pack)
+
+    def save_checkpoint(self, config: Config, population: Dict, species_set, generation: int) -> None:
+        print(f'Saving checkpoint to {self.get_manifest_path(generation)}')
+        self.save_manifest((generation, config, population, species_set, random.getstate()))
+
+    def load_checkpoint(self, generation: int) -> tuple:
+        with open(self.get_manifest_path(generation), 'rb') as file:
+            buffer = io.BytesIO(lzma.decompress(file.read()))
+
+        return ManifestUnpickler(buffer, self).load()
+
+    def restore_checkpoint(self, generation: int) -> Population:
+        generation, config, population, species_set, rndstate = self.load_checkpoint(generation)
+        random.setstate(rndstate)
+        return Population(config, (population, species_set, generation))
+
+    def import_checkpoint(self, filename: str) -> int:
+        with gzip.open(filename) as file:
+            checkpoint = pickle.load(file)
+
+        self.save_manifest(checkpoint)
+        return checkpoint[0]
+
+    def export_checkpoint(self, generation: int, filename: str) -> None:
+        with gzip.open(filename, 'w', compresslevel=5) as file:
+            pickle.dump(self.load_checkpoint(generation), file, protocol=pickle.HIGHEST_PROTOCOL)
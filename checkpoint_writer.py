@@ -0,0 +1,102 @@
+import atexit
+import gzip
+import os
+import pickle
+import queue
+import random
+import re
+import threading
+from typing import Callable, Optional
+
+from neat import Checkpointer
+
+
+def sync_folder(folder: str) -> None:
+    descriptor = os.open(folder or '.', os.O_RDONLY)
+
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def write_file(path: str, data: bytes) -> None:
+    # Readers only ever see the old file or the complete new one, never a truncated one.
+    with open(f'{path}.tmp', 'wb') as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(f'{path}.tmp', path)
+    sync_folder(os.path.dirname(path))
+
+
+def append_file(path: str, data: bytes) -> None:
+    with open(path, 'ab') as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+
+
+class CheckpointWriter:
+    DefaultMaxPending = 2
+
+    def __init__(self, max_pending: int = DefaultMaxPending):
+        self.queue = queue.Queue(max_pending)  # type: queue.Queue
+        self.error = None  # type: Optional[BaseException]
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        atexit.register(self.flush)
+
+    def run(self) -> None:
+        while True:
+            function, args = self.queue.get()
+
+            try:
+                function(*args)
+            except BaseException as error:
+                self.error = error
+            finally:
+                self.queue.task_done()
+
+    def check(self) -> None:
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def submit(self, function: Callable, *args) -> None:
+        self.check()
+
+        # Blocks while too many snapshots are still being written, so they cannot pile up in memory.
+        self.queue.put((function, args))
+
+    def flush(self) -> None:
+        self.queue.join()
+        self.check()
+
+
+def write_checkpoint(filename: str, data: bytes) -> None:
+    write_file(filename, gzip.compress(data, compresslevel=5))
+
+
+class AsyncCheckpointer(Checkpointer):
+    FilePattern = re.compile(r'checkpoint-(\d+)')
+
+    def __init__(self, writer: CheckpointWriter, generation_interval: int = 100, filename_prefix: str = 'checkpoint-'):
+        super().__init__(generation_interval=generation_interval, filename_prefix=filename_prefix)
+        self.writer = writer
+
+    def __getstate__(self):
+        # The checkpointer is pickled with the species set reporters, the writer thread stays behind.
+        state = self.__dict__.copy()
+        state['writer'] = None
+        return state
+
+    def save_checkpoint(self, config, population, species_set, generation):
+        filename = f'{self.filename_prefix}{generation}'
+        print(f'Saving checkpoint to {filename}')
+
+        # Pickling in memory is the snapshot, compressing and writing happen on the writer thread.
+        data = pickle.dumps((generation, config, population, species_set, random.getstate()),
+                            protocol=pickle.HIGHEST_PROTOCOL)
+        self.writer.submit(write_checkpoint, filename, data)
@@ -0,0 +1,157 @@
+from configparser import ConfigParser
+from typing import List, Tuple
+
+import numpy as np
+from neat import DefaultGenome, Config
+from neat.graphs import feed_forward_layers
+from numpy import ndarray
+
+
+class CompiledNetwork:
+    Section = 'Evaluation'
+    DataTypes = ['float64', 'float32']
+
+    def __init__(self, input_count: int, layers: List[Tuple[int, int, ndarray, ndarray]],
+                 output_indices: ndarray, node_count: int, dtype: str = 'float64'):
+        self.input_count = input_count
+        self.layers = layers
+        self.output_indices = output_indices
+        self.values = np.zeros(input_count + node_count, dtype=dtype)
+
+    @staticmethod
+    def load_dtype(filename: str) -> str:
+        parser = ConfigParser()
+        parser.read(filename)
+
+        dtype = parser.get(CompiledNetwork.Section, 'network_dtype', fallback='float64')
+
+        if dtype not in CompiledNetwork.DataTypes:
+            raise RuntimeError(f'Expected a network dtype in {CompiledNetwork.DataTypes}, got {dtype}')
+
+        return dtype
+
+    @staticmethod
+    def sigmoid(z: ndarray) -> ndarray:
+        return 1.0 / (1.0 + np.exp(-np.clip(5.0 * z, -60.0, 60.0)))
+
+    def activate(self, inputs: List[float]) -> List[float]:
+        if len(inputs) != self.input_count:
+            raise RuntimeError(f'Expected {self.input_count} inputs, got {len(inputs)}')
+
+        values = self.values
+        values[:self.input_count] = inputs
+
+        for start, end, weights, biases in self.layers:
+            z = weights @ values[:start] + biases
+            values[start:end] = CompiledNetwork.sigmoid(z)
+
+        return values[self.output_indices].tolist()
+
+    @staticmethod
+    def create(genome: DefaultGenome, config: Config, dtype: str = 'float64') -> 'CompiledNetwork':
+        genome_config = config.genome_config
+        input_keys = genome_config.input_keys
+        output_keys = genome_config.output_keys
+
+        connections = [cg.key for cg in genome.connections.values() if cg.enabled]
+        layers = feed_forward_layers(input_keys, output_keys, connections)
+
+        value_indices = {key: index for index, key in enumerate(input_keys)}
+
+        for layer in layers:
+            for node in sorted(layer):
+                value_indices[node] = len(value_indices)
+
+        # Outputs that are never evaluated keep their initial value of zero.
+        for node in output_keys:
+            if node not in value_indices:
+                value_indices[node] = len(value_indices)
+
+        compiled_layers = []
+        offset = len(input_keys)
+
+        for layer in layers:
+            nodes = sorted(layer)
+            weights = np.zeros((len(nodes), offset), dtype=dtype)
+            biases = np.zeros(len(nodes), dtype=dtype)
+
+            for row, node in enumerate(nodes):
+                ng = genome.nodes[node]
+
+                if ng.activation != 'sigmoid' or ng.aggregation != 'sum':
+                    raise RuntimeError(f'Unsupported node {node} with {ng.activation} activation '
+                                       f'and {ng.aggregation} aggregation')
+
+                biases[row] = ng.bias
+
+                for conn_key in connections:
+                    inode, onode = conn_key
+
+                    if onode == node:
+                        weights[row, value_indices[inode]] = ng.response * genome.connections[conn_key].weight
+
+            compiled_layers.append((offset, offset + len(nodes), weights, biases))
+            offset += len(nodes)
+
+        output_indices = np.array([value_indices[node] for node in output_keys])
+        node_count = len(value_indices) - len(input_keys)
+
+        return CompiledNetwork(len(input_keys), compiled_layers, output_indices, node_count, dtype)
+
+
+class BatchNetwork:
+    def __init__(self, input_count: int, layers: List[Tuple[ndarray, ndarray, ndarray]], output_indices: ndarray,
+                 value_count: int, dtype: type = np.float64):
+        self.input_count = input_count
+        self.layers = layers
+        self.output_indices = output_indices
+        self.value_count = value_count
+        self.rows = np.arange(len(output_indices))[:, None]
+        self.values = np.zeros((len(output_indices), value_count + 1), dtype=dtype)
+
+    @staticmethod
+    def sigmoid(z: ndarray) -> ndarray:
+        return 1.0 / (1.0 + np.exp(-np.clip(5.0 * z, -60.0, 60.0)))
+
+    def activate(self, inputs: ndarray) -> ndarray:
+        if inputs.shape != (len(self.output_indices), self.input_count):
+            raise RuntimeError(f'Expected {len(self.output_indices)} x {self.input_count} inputs, got {inputs.shape}')
+
+        values = self.values
+        values[:, :self.input_count] = inputs
+
+        for weights, biases, targets in self.layers:
+            z = np.matmul(weights, values[:, :self.value_count, None])[:, :, 0] + biases
+            values[self.rows, targets] = BatchNetwork.sigmoid(z)
+
+        return values[self.rows, self.output_indices]
+
+    @staticmethod
+    def create(networks: List[CompiledNetwork]) -> 'BatchNetwork':
+        input_count = networks[0].input_count
+        dtype = networks[0].values.dtype
+        value_count = max(len(network.values) for network in networks)
+        depth = max(len(network.layers) for network in networks)
+
+        # Networks with fewer or narrower layers are padded with rows that write to a scratch column.
+        compiled_layers = []
+
+        for layer in range(depth):
+            node_count = max(end - start for network in networks if layer < len(network.layers)
+                             for start, end, weights, biases in [network.layers[layer]])
+            weights = np.zeros((len(networks), node_count, value_count), dtype=dtype)
+            biases = np.zeros((len(networks), node_count), dtype=dtype)
+            targets = np.full((len(networks), node_count), value_count)
+
+            for row, network in enumerate(networks):
+                if layer < len(network.layers):
+                    start, end, layer_weights, layer_biases = network.layers[layer]
+                    weights[row, :end - start, :start] = layer_weights
+                    biases[row, :end - start] = layer_biases
+                    targets[row, :end - start] = np.arange(start, end)
+
+            compiled_layers.append((weights, biases, targets))
+
+        output_indices = np.stack([network.output_indices for network in networks])
+
+        return BatchNetwork(input_count, compiled_layers, output_indices, value_count, dtype)
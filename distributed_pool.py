@@ -0,0 +1,195 @@
+import itertools
+import os
+import queue
+import threading
+import time
+from collections import deque
+from multiprocessing import Pool, AuthenticationError
+from multiprocessing.connection import Listener, Client, Connection
+from typing import Callable, Dict, Iterable, List, Tuple, Deque, Optional, Any
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    host, port = address.rsplit(':', 1)
+    return host or 'localhost', int(port)
+
+
+def get_authkey() -> bytes:
+    authkey = os.environ.get('THESIS_AUTHKEY', '')
+
+    # Connected peers run pickled code on each other, so there is no default key to fall back on.
+    if authkey == '':
+        raise RuntimeError('Expected a shared secret in THESIS_AUTHKEY for the distributed pool')
+
+    return authkey.encode()
+
+
+class DistributedPool:
+    DefaultBatchSize = 8
+    DefaultTimeout = 600.0
+    PollInterval = 1.0
+
+    def __init__(self, address: Tuple[str, int], setup_args: Tuple, batch_size: int = DefaultBatchSize,
+                 timeout: float = DefaultTimeout):
+        self.setup_args = setup_args
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.listener = Listener(address, authkey=get_authkey())
+        self.condition = threading.Condition()
+        self.task_ids = itertools.count()
+        self.tasks = {}  # type: Dict[int, Tuple[Callable, List]]
+        self.pending = deque()  # type: Deque[int]
+        self.started = {}  # type: Dict[int, float]
+        self.results = queue.Queue()  # type: queue.Queue[Tuple[int, List]]
+        self.workers = 0
+        self.closed = False
+
+        threading.Thread(target=self.accept, daemon=True).start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+        self.listener.close()
+
+    def accept(self) -> None:
+        while not self.closed:
+            try:
+                connection = self.listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                # Failed handshakes are dropped, a closed listener ends the loop.
+                continue
+
+            threading.Thread(target=self.serve, args=(connection,), daemon=True).start()
+
+    def serve(self, connection: Connection) -> None:
+        task_id = None  # type: Optional[int]
+
+        with self.condition:
+            self.workers += 1
+
+        print(f'Distributed pool: worker connected ({self.workers} total)')
+
+        try:
+            connection.send(('setup', self.setup_args))
+
+            while True:
+                message = connection.recv()
+
+                if message[0] == 'result':
+                    self.complete(message[1], message[2])
+                    task_id = None
+
+                task = self.take()
+
+                if task is None:
+                    break
+
+                task_id, function, jobs = task
+                connection.send(('task', task_id, function, jobs))
+        except (OSError, EOFError):
+            pass
+        finally:
+            # The task of a lost worker goes back to the queue right away instead of waiting for the timeout.
+            with self.condition:
+                self.workers -= 1
+
+                if task_id is not None and task_id in self.started:
+                    del self.started[task_id]
+                    self.pending.appendleft(task_id)
+                    self.condition.notify()
+
+            connection.close()
+            print(f'Distributed pool: worker disconnected ({self.workers} total)')
+
+    def take(self) -> Optional[Tuple[int, Callable, List]]:
+        with self.condition:
+            while not self.closed and len(self.pending) == 0:
+                self.condition.wait()
+
+            if self.closed:
+                return None
+
+            # The task is read under the lock, a late duplicate result may complete it right after.
+            task_id = self.pending.popleft()
+            self.started[task_id] = time.monotonic()
+            return (task_id,) + self.tasks[task_id]
+
+    def complete(self, task_id: int, outputs: List) -> None:
+        with self.condition:
+            # A requeued task may finish twice, only the first result counts.
+            if task_id not in self.tasks:
+                return
+
+            del self.tasks[task_id]
+            self.started.pop(task_id, None)
+
+            if task_id in self.pending:
+                self.pending.remove(task_id)
+
+        self.results.put((task_id, outputs))
+
+    def requeue(self) -> None:
+        now = time.monotonic()
+
+        with self.condition:
+            expired = [task_id for task_id, started in self.started.items() if now - started > self.timeout]
+
+            for task_id in expired:
+                del self.started[task_id]
+                self.pending.append(task_id)
+
+            if expired:
+                print(f'Distributed pool: {len(expired)} tasks timed out and were requeued')
+                self.condition.notify_all()
+
+    def imap_unordered(self, function: Callable, jobs: Iterable) -> Iterable[Any]:
+        jobs = list(jobs)
+        task_ids = set()
+
+        with self.condition:
+            for index in range(0, len(jobs), self.batch_size):
+                task_id = next(self.task_ids)
+                self.tasks[task_id] = (function, jobs[index:index + self.batch_size])
+                self.pending.append(task_id)
+                task_ids.add(task_id)
+
+            self.condition.notify_all()
+
+        while task_ids:
+            try:
+                task_id, outputs = self.results.get(timeout=DistributedPool.PollInterval)
+            except queue.Empty:
+                self.requeue()
+                continue
+
+            if task_id in task_ids:
+                task_ids.remove(task_id)
+                yield from outputs
+
+
+def run_worker(address: Tuple[str, int], processes: int) -> None:
+    from shared import worker_setup
+
+    connection = Client(address, authkey=get_authkey())
+    message, setup_args = connection.recv()
+
+    with Pool(processes, initializer=worker_setup, initargs=setup_args) as pool:
+        connection.send(('ready',))
+
+        while True:
+            try:
+                message, task_id, function, jobs = connection.recv()
+            except (OSError, EOFError):
+                break
+
+            connection.send(('result', task_id, pool.map(function, jobs)))
+
+    connection.close()
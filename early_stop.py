@@ -0,0 +1,110 @@
+from typing import Tuple, Optional, List
+
+import numpy as np
+from numpy import ndarray
+
+from batch_game import BatchGame
+from game import Game
+from game_snapshot import GameSnapshot
+
+
+class EarlyStop:
+    def __init__(self, stall_rounds: int = 0, cutoff_quantile: float = None):
+        self.stall_rounds = stall_rounds
+        self.cutoff_quantile = cutoff_quantile
+        self.cutoff = None  # type: Optional[float]
+        self.horizon = None  # type: Optional[int]
+        self.counters = None  # type: Tuple[int, int, int, int]
+        self.stalls = 0
+        self.batch_counters = None  # type: ndarray
+        self.batch_stalls = None  # type: ndarray
+        self.paused = False
+        self.batch_paused = None  # type: ndarray
+
+    def reset(self) -> None:
+        self.counters = None
+        self.stalls = 0
+        self.batch_counters = None
+        self.batch_stalls = None
+        self.paused = False
+        self.batch_paused = None
+
+    def get_state(self) -> Tuple[Optional[Tuple[int, int, int, int]], int, bool]:
+        return self.counters, self.stalls, self.paused
+
+    def get_batch_state(self, index: int) -> Tuple[Optional[Tuple[int, int, int, int]], int, bool]:
+        if self.batch_counters is None:
+            return None, 0, False
+
+        return tuple(self.batch_counters[index].tolist()), int(self.batch_stalls[index]), bool(self.batch_paused[index])
+
+    def load_state(self, snapshot: GameSnapshot) -> None:
+        self.counters = snapshot.stop_counters
+        self.stalls = snapshot.stop_stalls
+        self.paused = False
+
+    def load_batch_state(self, snapshots: List[GameSnapshot]) -> None:
+        self.batch_counters = np.array([snapshot.stop_counters or (-1, -1, -1, -1) for snapshot in snapshots])
+        self.batch_stalls = np.array([snapshot.stop_stalls for snapshot in snapshots])
+        self.batch_paused = np.zeros(len(snapshots), dtype=bool)
+
+    def update_cutoff(self, fitnesses: List[float]) -> None:
+        if self.cutoff_quantile is not None and len(fitnesses) > 0:
+            self.cutoff = float(np.quantile(fitnesses, self.cutoff_quantile))
+
+    @staticmethod
+    def get_counters(game: Game) -> Tuple[int, int, int, int]:
+        return game.get_tile_count(Game.BluePlayer), game.get_tile_count(Game.RedPlayer), \
+               game.get_troop_count(Game.BluePlayer), game.get_troop_count(Game.RedPlayer)
+
+    @staticmethod
+    def get_batch_counters(batch: BatchGame) -> ndarray:
+        return np.stack([
+            batch.get_tile_counts(Game.BluePlayer),
+            batch.get_tile_counts(Game.RedPlayer),
+            batch.get_troop_counts(Game.BluePlayer),
+            batch.get_troop_counts(Game.RedPlayer),
+        ], axis=1)
+
+    def should_stop(self, game: Game) -> bool:
+        counters = EarlyStop.get_counters(game)
+        self.stalls = self.stalls + 1 if counters == self.counters else 0
+        self.counters = counters
+
+        if 0 < self.stall_rounds <= self.stalls:
+            return True
+
+        if self.cutoff is not None and game.get_fitness_bound() < self.cutoff:
+            return True
+
+        # Only games stopped by the horizon alone are paused, the others would not have continued anyway.
+        self.paused = self.horizon is not None and game.rounds >= self.horizon
+        return self.paused
+
+    def should_stop_batch(self, batch: BatchGame) -> ndarray:
+        counters = EarlyStop.get_batch_counters(batch)
+
+        if self.batch_counters is None:
+            self.batch_stalls = np.zeros(batch.size, dtype=int)
+            self.batch_paused = np.zeros(batch.size, dtype=bool)
+        else:
+            # Games that already ended keep their counters, a paused game resumes from them.
+            unchanged = np.all(counters == self.batch_counters, axis=1)
+            self.batch_stalls = np.where(batch.active, np.where(unchanged, self.batch_stalls + 1, 0), self.batch_stalls)
+            counters = np.where(batch.active[:, np.newaxis], counters, self.batch_counters)
+
+        self.batch_counters = counters
+        stopped = np.zeros(batch.size, dtype=bool)
+
+        if self.stall_rounds > 0:
+            stopped |= self.batch_stalls >= self.stall_rounds
+
+        if self.cutoff is not None:
+            stopped |= batch.game.get_batch_fitness_bound(batch) < self.cutoff
+
+        if self.horizon is not None:
+            paused = (batch.rounds >= self.horizon) & ~stopped
+            self.batch_paused = np.where(batch.active, paused, self.batch_paused)
+            stopped |= paused
+
+        return stopped
@@ -0,0 +1,81 @@
+import copy
+from configparser import ConfigParser
+from typing import List, Optional
+
+import numpy as np
+
+from game import Game
+from game_episode import GameEpisode
+from game_result import GameResult
+
+
+class EpisodePool:
+    Section = 'Evaluation'
+    Aggregates = ['mean', 'min', 'quantile']
+
+    def __init__(self, preset: int, episodes: List[GameEpisode], aggregate: str = 'mean', quantile: float = 0.25):
+        if len(episodes) < 1:
+            raise RuntimeError('Expected at least one episode for multi-episode evaluation')
+
+        if aggregate not in EpisodePool.Aggregates:
+            raise RuntimeError(f'Expected an episode aggregate in {EpisodePool.Aggregates}, got {aggregate}')
+
+        if not 0.0 <= quantile <= 1.0:
+            raise RuntimeError(f'Expected an episode quantile between 0 and 1, got {quantile}')
+
+        self.preset = preset
+        self.episodes = episodes
+        self.aggregate = aggregate
+        self.quantile = quantile
+
+    @staticmethod
+    def create_episodes(game: Game, count: int) -> List[GameEpisode]:
+        # The first episode uses the default seed so a single episode plays the usual map.
+        return [game.create_episode(seed) for seed in range(Game.DefaultSeed, Game.DefaultSeed + count)]
+
+    @staticmethod
+    def load(filename: str, preset: int, game: Game) -> Optional['EpisodePool']:
+        parser = ConfigParser()
+        parser.read(filename)
+
+        count = parser.getint(EpisodePool.Section, 'episodes', fallback=1)
+
+        if count <= 1:
+            return None
+
+        aggregate = parser.get(EpisodePool.Section, 'episode_aggregate', fallback='mean')
+        quantile = parser.getfloat(EpisodePool.Section, 'episode_quantile', fallback=0.25)
+        episodes = EpisodePool.create_episodes(game, count)
+
+        # Presets with a fixed map and a red player that never moves would replay the same game every episode.
+        if not game.is_red_simulated() and EpisodePool.has_same_boards(episodes):
+            print(f'Multi-episode evaluation: preset {preset} plays the same game on every seed, using one episode')
+            return None
+
+        return EpisodePool(preset, episodes, aggregate, quantile)
+
+    @staticmethod
+    def has_same_boards(episodes: List[GameEpisode]) -> bool:
+        return all(np.array_equal(episode.map_owners, episodes[0].map_owners)
+                   and np.array_equal(episode.map_troops, episodes[0].map_troops) for episode in episodes)
+
+    def get_variant(self) -> str:
+        # Episode fitness is normalized by each seed's own starting board, older cache entries were not.
+        return f'episodes={len(self.episodes)},{self.aggregate},{self.quantile},start-normalized'
+
+    def get_fitness(self, fitnesses: List[float]) -> float:
+        if self.aggregate == 'min':
+            return float(np.min(fitnesses))
+        elif self.aggregate == 'quantile':
+            return float(np.quantile(fitnesses, self.quantile))
+        else:
+            return float(np.mean(fitnesses))
+
+    def aggregate_results(self, game_results: List[GameResult]) -> GameResult:
+        # Tiles, troops, moves and the winner describe the first episode, which plays the default map.
+        game_result = copy.copy(game_results[0])
+        game_result.rounds = max(result.rounds for result in game_results)
+        game_result.skipped_rounds = sum(result.skipped_rounds for result in game_results)
+        game_result.episode_fitness = [result.fitness for result in game_results]
+        game_result.fitness = self.get_fitness(game_result.episode_fitness)
+        return game_result
@@ -0,0 +1,67 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Optional
+
+from neat import DefaultGenome
+
+from game_result import GameResult
+
+
+class FitnessCache:
+    DefaultMaxSize = 10000
+
+    def __init__(self, preset: int, max_size: int = DefaultMaxSize, variant: str = ''):
+        self.preset = preset
+        self.max_size = max_size
+        self.variant = variant
+        self.path = f'./fitness-cache-{preset}.json'
+        self.entries = OrderedDict()  # type: OrderedDict[str, dict]
+        self.load()
+
+    def get_genome_hash(self, genome: DefaultGenome) -> str:
+        nodes = [
+            (key, ng.bias.hex(), ng.response.hex(), ng.activation, ng.aggregation)
+            for key, ng in sorted(genome.nodes.items())
+        ]
+
+        connections = [
+            (key, cg.weight.hex())
+            for key, cg in sorted(genome.connections.items()) if cg.enabled
+        ]
+
+        # Evaluation modes that change the fitness, such as multiple episodes, hash to different entries.
+        content = repr((self.preset, nodes, connections)) + self.variant
+        return hashlib.sha1(content.encode()).hexdigest()
+
+    def get(self, genome: DefaultGenome) -> Optional[GameResult]:
+        genome_hash = self.get_genome_hash(genome)
+
+        if genome_hash not in self.entries:
+            return None
+
+        self.entries.move_to_end(genome_hash)
+
+        game_result = GameResult(game_json=self.entries[genome_hash])
+        game_result.genome_key = genome.key
+        return game_result
+
+    def put(self, genome: DefaultGenome, game_result: GameResult) -> None:
+        genome_hash = self.get_genome_hash(genome)
+        self.entries[genome_hash] = vars(game_result).copy()
+        self.entries.move_to_end(genome_hash)
+
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def load(self) -> None:
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as file:
+                self.entries = OrderedDict(json.load(file))
+
+    def save(self) -> None:
+        with open(f'{self.path}.tmp', 'w') as file:
+            json.dump(self.entries, file)
+
+        os.replace(f'{self.path}.tmp', self.path)
@@ -1,10 +1,55 @@
-from typing import Tuple, List
+from typing import Tuple, List, Dict, FrozenSet, Optional, TYPE_CHECKING
 
 import numpy as np
 from numpy import ndarray
 from numpy.random import Generator
 
+from game_episode import GameEpisode
 from game_player import GamePlayer
+from game_reward import RewardTable, DefaultPayoff
+from game_snapshot import GameSnapshot
+
+if TYPE_CHECKING:
+    from batch_game import BatchGame
+
+
+def create_zobrist_keys(map_size: int, troop_max: int) -> List[List[int]]:
+    random = np.random.default_rng(0)
+    keys = random.integers(0, 2 ** 64, size=(map_size, 2 * troop_max + 1), dtype=np.uint64)
+    return keys.tolist()
+
+
+def create_tile_coords(width: int, height: int) -> List[Tuple[int, int]]:
+    return [(i, j) for i in range(width) for j in range(height)]
+
+
+def create_tile_adj_indices(tile_adj: Dict[Tuple[int, int], List[Tuple[int, int]]],
+                            tile_numbers: Dict[Tuple[int, int], int]) -> List[Tuple[int, ...]]:
+    adj_indices = [()] * len(tile_numbers)
+
+    for tile, tiles_adj in tile_adj.items():
+        adj_indices[tile_numbers[tile]] = tuple(tile_numbers[tile_adj] for tile_adj in tiles_adj)
+
+    return adj_indices
+
+
+def create_tile_matrix(tile_indices: List) -> ndarray:
+    matrix = np.zeros((len(tile_indices), len(tile_indices)), dtype=bool)
+
+    for s_idx, t_indices in enumerate(tile_indices):
+        matrix[s_idx, list(t_indices)] = True
+
+    return matrix
+
+
+def create_tile_reach_indices(tile_coords: List[Tuple[int, int]]) -> List[FrozenSet[int]]:
+    return [
+        frozenset(
+            t_idx for t_idx, (t_i, t_j) in enumerate(tile_coords)
+            if s_idx != t_idx and abs(s_i - t_i) <= 1 and abs(s_j - t_j) <= 1
+        )
+        for s_idx, (s_i, s_j) in enumerate(tile_coords)
+    ]
 
 
 class Game:
@@ -20,8 +65,57 @@ class Game:
     ProductionMove = 0
     AttackMove = 1
     TransportMove = 2
-
-    def __init__(self):
+    DefaultSeed = 2
+    TileCoords = create_tile_coords(MapWidth, MapHeight)
+    TileNumbers = {coords: index for index, coords in enumerate(TileCoords)}
+    TileAdj = {
+        (0, 0): [(0, 1), (1, 0)],
+        (0, 1): [(0, 0), (0, 2), (1, 0), (1, 1)],
+        (0, 2): [(0, 1), (1, 1), (1, 2), (0, 3)],
+        (0, 3): [(0, 2), (1, 2), (1, 3), (0, 4)],
+        (0, 4): [(0, 3), (1, 3), (1, 4), (0, 5)],
+        (0, 5): [(0, 4), (1, 4), (1, 5)],
+        (1, 0): [(0, 0), (0, 1), (1, 1), (2, 0), (2, 1)],
+        (1, 1): [(0, 1), (0, 2), (1, 0), (1, 2), (2, 1), (2, 2)],
+        (1, 2): [(0, 2), (0, 3), (1, 1), (1, 3), (2, 2), (2, 3)],
+        (1, 3): [(0, 3), (0, 4), (1, 2), (1, 4), (2, 3), (2, 4)],
+        (1, 4): [(0, 4), (0, 5), (1, 3), (1, 5), (2, 4), (2, 5)],
+        (1, 5): [(0, 5), (1, 4), (2, 5)],
+        (2, 0): [(1, 0), (2, 1), (3, 0)],
+        (2, 1): [(1, 0), (1, 1), (2, 0), (2, 2), (3, 0), (3, 1)],
+        (2, 2): [(1, 1), (1, 2), (2, 1), (2, 3), (3, 1), (3, 2)],
+        (2, 3): [(1, 2), (1, 3), (2, 2), (2, 4), (3, 2), (3, 3)],
+        (2, 4): [(1, 3), (1, 4), (2, 3), (2, 5), (3, 3), (3, 4)],
+        (2, 5): [(1, 4), (1, 5), (2, 4), (3, 4), (3, 5)],
+        (3, 0): [(2, 0), (2, 1), (3, 1), (4, 0), (4, 1)],
+        (3, 1): [(2, 1), (2, 2), (3, 0), (3, 2), (4, 1), (4, 2)],
+        (3, 2): [(2, 2), (2, 3), (3, 1), (3, 3), (4, 2), (4, 3)],
+        (3, 3): [(2, 3), (2, 4), (3, 2), (3, 4), (4, 3), (4, 4)],
+        (3, 4): [(2, 4), (2, 5), (3, 3), (3, 5), (4, 4), (4, 5)],
+        (3, 5): [(2, 5), (3, 4), (4, 5)],
+        (4, 0): [(3, 0), (4, 1), (5, 0)],
+        (4, 1): [(3, 0), (3, 1), (4, 0), (4, 2), (5, 0), (5, 1)],
+        (4, 2): [(3, 1), (3, 2), (4, 1), (4, 3), (5, 1), (5, 2)],
+        (4, 3): [(3, 2), (3, 3), (4, 2), (4, 4), (5, 2), (5, 3)],
+        (4, 4): [(3, 3), (3, 4), (4, 3), (4, 5), (5, 3), (5, 4)],
+        (4, 5): [(3, 4), (3, 5), (4, 4), (5, 4), (5, 5)],
+        (5, 0): [(4, 0), (4, 1), (5, 1)],
+        (5, 1): [(4, 1), (4, 2), (5, 0), (5, 2)],
+        (5, 2): [(4, 2), (4, 3), (5, 1), (5, 3)],
+        (5, 3): [(4, 3), (4, 4), (5, 2), (5, 4)],
+        (5, 4): [(4, 4), (4, 5), (5, 3), (5, 5)],
+        (5, 5): [(4, 5), (5, 4)],
+    }
+    TileAdjIndices = create_tile_adj_indices(TileAdj, TileNumbers)
+    TileReachIndices = create_tile_reach_indices(TileCoords)
+    TileAdjMatrix = create_tile_matrix(TileAdjIndices)
+    TileReachMatrix = create_tile_matrix(TileReachIndices)
+    ZobristKeys = create_zobrist_keys(MapSize, TileTroopMax)
+    Rewards = RewardTable(DefaultPayoff)
+    Debug = False
+
+    def __init__(self, headless: bool = False):
+        self.headless = headless
         self.state_parser = None
         self.game_map = None
         self.nature_player = None
@@ -29,30 +123,71 @@ class Game:
         self.red_player = None
         self.map_owners = None
         self.map_troops = None
+        self.tile_counts = None  # type: List[int]
+        self.troop_counts = None  # type: List[int]
+        self.inputs = None  # type: List[float]
         self.player_id = None
         self.rounds = None
-        self.states = None
+        self.skipped_rounds = None
+        self.state_hash = None
+        self.state_counts = None  # type: Dict[int, int]
         self.random = None  # type: Generator
         self.strategy = None
+        self.episode = None  # type: GameEpisode
+        self.start_episode = None  # type: GameEpisode
+        self.red_start_tiles = None
+        self.red_start_troops = None
         self.reset_game()
 
-    def reset_game(self, create_game_map: bool = True) -> None:
+    def reset_game(self, create_game_map: bool = True, episode: GameEpisode = None) -> None:
         from state_parser import StateParser
-        from game_map import GameMap
-
-        self.state_parser = StateParser()
-        self.state_parser.game = self
-        self.game_map = GameMap() if create_game_map else self.game_map
-        self.game_map.game = self
-        self.game_map.state_parser = self.state_parser
-        self.nature_player = GamePlayer('nature', '#D4D4D8')
-        self.blue_player = GamePlayer('blue', '#2563EB')
-        self.red_player = GamePlayer('red', '#DC2626')
+
+        if self.state_parser is None:
+            self.state_parser = StateParser()
+            self.state_parser.game = self
+
+        if not self.headless:
+            from game_map import GameMap
+
+            self.game_map = GameMap() if create_game_map else self.game_map
+            self.game_map.game = self
+            self.game_map.state_parser = self.state_parser
+
+        if self.nature_player is None:
+            self.nature_player = GamePlayer('nature', '#D4D4D8')
+            self.blue_player = GamePlayer('blue', '#2563EB')
+            self.red_player = GamePlayer('red', '#DC2626')
+        else:
+            self.nature_player.reset()
+            self.blue_player.reset()
+            self.red_player.reset()
+
         self.player_id = Game.RedPlayer
-        self.states = []
-        self.random = np.random.default_rng(2)  # type: Generator
+        self.state_counts = {}
         self.rounds = 0
-        self.map_owners, self.map_troops = self.get_map()
+        self.skipped_rounds = 0
+
+        # The default map is generated once, later games start from the same board and random state.
+        if episode is None:
+            if self.episode is None:
+                self.episode = self.create_episode(Game.DefaultSeed)
+
+            episode = self.episode
+
+        self.start_episode = episode
+        self.random = np.random.default_rng(episode.seed)  # type: Generator
+        self.random.bit_generator.state = episode.random_state
+
+        # Fitness is measured against the board this game started from, which differs between episode seeds.
+        self.red_start_tiles = episode.red_tiles
+        self.red_start_troops = episode.red_troops
+
+        if self.map_owners is None:
+            self.map_owners, self.map_troops = episode.map_owners.copy(), episode.map_troops.copy()
+            self.refresh_counters()
+        else:
+            self.load_board(episode.map_owners, episode.map_troops)
+
         self.strategy = Game.ProductionMove
 
     @staticmethod
@@ -62,8 +197,54 @@ class Game:
         game.map_troops = other_game.map_troops.copy()
         game.player_id = other_game.player_id
         game.rounds = other_game.rounds
+        game.refresh_counters()
         return game
 
+    @staticmethod
+    def create_board(map_owners: ndarray, map_troops: ndarray) -> Tuple[ndarray, ndarray]:
+        return np.array(map_owners, dtype=np.int8).reshape(Game.MapSize), \
+               np.array(map_troops, dtype=np.int8).reshape(Game.MapSize)
+
+    def create_episode(self, seed: int) -> GameEpisode:
+        self.random = np.random.default_rng(seed)
+        map_owners, map_troops = self.create_board(*self.get_map())
+        red_tiles = int(np.count_nonzero(map_owners == Game.RedPlayer))
+        red_troops = int(np.sum(np.where(map_owners == Game.RedPlayer, map_troops, 0)))
+        return GameEpisode(seed, map_owners, map_troops, self.random.bit_generator.state, red_tiles, red_troops)
+
+    def get_snapshot(self, stop_counters: Optional[Tuple[int, int, int, int]], stop_stalls: int,
+                     paused: bool) -> GameSnapshot:
+        players = [self.get_player(player_id) for player_id in [Game.NaturePlayer, Game.BluePlayer, Game.RedPlayer]]
+        player_moves = np.array([
+            [player.production_moves, player.attack_moves, player.transport_moves, player.guided_moves]
+            for player in players
+        ])
+
+        return GameSnapshot(
+            self.start_episode, self.map_owners.copy(), self.map_troops.copy(), self.rounds, self.skipped_rounds,
+            dict(self.state_counts), self.random.bit_generator.state, player_moves,
+            [list(player.per_move_fitness) for player in players], stop_counters, stop_stalls, paused,
+        )
+
+    def load_snapshot(self, snapshot: GameSnapshot) -> None:
+        players = [self.get_player(player_id) for player_id in [Game.NaturePlayer, Game.BluePlayer, Game.RedPlayer]]
+
+        self.load_board(snapshot.map_owners, snapshot.map_troops)
+        self.rounds = snapshot.rounds
+        # A paused game continues from the saved round, its skipped rounds are played now.
+        self.skipped_rounds = 0 if snapshot.paused else snapshot.skipped_rounds
+        self.state_counts = dict(snapshot.state_counts)
+        self.random.bit_generator.state = snapshot.random_state
+
+        for player, moves, per_move_fitness in zip(players, snapshot.player_moves.tolist(), snapshot.per_move_fitness):
+            player.production_moves, player.attack_moves, player.transport_moves, player.guided_moves = moves
+            player.per_move_fitness = list(per_move_fitness)
+
+    def load_board(self, map_owners: ndarray, map_troops: ndarray) -> None:
+        self.map_owners[:] = map_owners
+        self.map_troops[:] = map_troops
+        self.refresh_counters()
+
     def get_map(self) -> Tuple[ndarray, ndarray]:
         map_owners = np.array([
             [1, 0, 0, 0, 0, 0],
@@ -91,9 +272,15 @@ class Game:
     def get_max_rounds(self) -> int:
         return 500
 
+    def get_fitness_bound(self) -> float:
+        return np.inf
+
     def is_red_simulated(self) -> bool:
         return True
 
+    def get_reward_table(self) -> RewardTable:
+        return Game.Rewards
+
     def has_ended(self) -> bool:
         return self.rounds >= self.get_max_rounds() \
                or self.get_tile_count(Game.BluePlayer) == 0 \
@@ -111,6 +298,28 @@ class Game:
 
         return Game.NaturePlayer
 
+    def get_batch_fitness(self, batch: 'BatchGame') -> ndarray:
+        return np.zeros(batch.size)
+
+    def get_batch_fitness_bound(self, batch: 'BatchGame') -> ndarray:
+        return np.full(batch.size, np.inf)
+
+    def has_batch_ended(self, batch: 'BatchGame') -> ndarray:
+        return (batch.rounds >= self.get_max_rounds()) \
+               | (batch.get_tile_counts(Game.BluePlayer) == 0) \
+               | (batch.get_tile_counts(Game.RedPlayer) == 0) \
+               | batch.is_state_repeated()
+
+    def get_batch_winner(self, batch: 'BatchGame') -> ndarray:
+        blue_tiles = batch.get_tile_counts(Game.BluePlayer)
+        red_tiles = batch.get_tile_counts(Game.RedPlayer)
+        winners = np.full(batch.size, Game.NaturePlayer)
+
+        winners[(blue_tiles > 0) & (red_tiles == 0)] = Game.BluePlayer
+        winners[(red_tiles > 0) & (blue_tiles == 0)] = Game.RedPlayer
+
+        return winners
+
     def get_player(self, player_id: int) -> GamePlayer:
         if player_id == Game.BluePlayer:
             return self.blue_player
@@ -120,45 +329,134 @@ class Game:
             return self.nature_player
 
     def create_state(self):
-        state = []
+        signs = np.where(self.map_owners == Game.BluePlayer, 1, -1)
+        return (signs * self.map_troops).tolist()
 
-        for i in range(Game.MapWidth):
-            for j in range(Game.MapHeight):
-                tile = (i, j)
-                sign = 1 if self.get_tile_owner(tile) == Game.BluePlayer else -1
-                troops = self.get_tile_troops(tile)
-                state.append(sign * troops)
+    def create_state_hash(self) -> int:
+        state_hash = 0
 
-        return state
+        for index, value in enumerate(self.create_state()):
+            state_hash ^= Game.ZobristKeys[index][value + Game.TileTroopMax]
+
+        return state_hash
+
+    @staticmethod
+    def get_state_value(owner: int, troops: int) -> int:
+        return troops if owner == Game.BluePlayer else -troops
 
     def save_state(self) -> None:
-        self.states.append(self.create_state())
+        self.state_counts[self.state_hash] = self.state_counts.get(self.state_hash, 0) + 1
 
     def is_state_repeated(self) -> bool:
-        state = self.create_state()
-        repeats = len(list(filter(lambda past_state: past_state == state, self.states))) - 1
+        repeats = self.state_counts.get(self.state_hash, 0) - 1
         return repeats >= 3
 
+    def count_board(self) -> Tuple[List[int], List[int], List[float]]:
+        players = [Game.NaturePlayer, Game.BluePlayer, Game.RedPlayer]
+        tile_counts = np.bincount(self.map_owners, minlength=len(players)).tolist()
+        troop_counts = [int(self.map_troops[self.map_owners == player_id].sum()) for player_id in players]
+        inputs = [Game.encode_tile(owner, troops) for owner, troops in zip(self.map_owners.tolist(), self.map_troops.tolist())]
+        return tile_counts, troop_counts, inputs
+
+    def refresh_counters(self) -> None:
+        self.tile_counts, self.troop_counts, self.inputs = self.count_board()
+        self.state_hash = self.create_state_hash()
+
+    def check_counters(self) -> None:
+        tile_counts, troop_counts, inputs = self.count_board()
+
+        if tile_counts != self.tile_counts:
+            raise Exception(f'Cached tile counts {self.tile_counts} do not match the board {tile_counts}.')
+
+        if troop_counts != self.troop_counts:
+            raise Exception(f'Cached troop counts {self.troop_counts} do not match the board {troop_counts}.')
+
+        if inputs != self.inputs:
+            raise Exception('Cached inputs do not match the board.')
+
+        if self.create_state_hash() != self.state_hash:
+            raise Exception('Cached state hash does not match the board.')
+
+    @staticmethod
+    def encode_tile(owner: int, troops: int) -> float:
+        sign = 0
+
+        if owner == Game.BluePlayer:
+            sign = 1
+        elif owner == Game.RedPlayer:
+            sign = -1
+
+        return (sign * troops) / Game.TileTroopMax
+
+    def set_tile(self, index: int, owner: int, troops: int) -> None:
+        prev_owner = int(self.map_owners[index])
+        prev_troops = int(self.map_troops[index])
+
+        self.tile_counts[prev_owner] -= 1
+        self.troop_counts[prev_owner] -= prev_troops
+        self.tile_counts[owner] += 1
+        self.troop_counts[owner] += troops
+
+        self.map_owners[index] = owner
+        self.map_troops[index] = troops
+        self.inputs[index] = Game.encode_tile(owner, troops)
+
+        zobrist_keys = Game.ZobristKeys[index]
+        self.state_hash ^= zobrist_keys[Game.get_state_value(prev_owner, prev_troops) + Game.TileTroopMax]
+        self.state_hash ^= zobrist_keys[Game.get_state_value(owner, troops) + Game.TileTroopMax]
+
     def increase_round(self) -> None:
         self.rounds += 1
 
+    def get_move_deltas(self, move_type: int, source_tile: Tuple[int, int], target_tile: Tuple[int, int],
+                        troops: int) -> Tuple[int, int, int, int]:
+        if move_type == Game.ProductionMove:
+            return 0, 1, 0, 0
+        elif move_type != Game.AttackMove and move_type != Game.TransportMove:
+            return 0, 0, 0, 0
+
+        s_idx = Game.TileNumbers[source_tile]
+        t_idx = Game.TileNumbers[target_tile]
+        enemy_id = Game.BluePlayer if self.player_id == Game.RedPlayer else Game.RedPlayer
+
+        my_tiles = -1 if self.map_troops[s_idx] - troops < Game.TileTroopMin else 0
+
+        if move_type == Game.TransportMove:
+            return my_tiles, 0, 0, 0
+
+        defenders = int(self.map_troops[t_idx])
+        my_troops = -troops
+        enemy_tiles = 0
+        enemy_troops = 0
+
+        if defenders < troops:
+            my_tiles += 1
+            my_troops += troops - defenders
+
+        if self.map_owners[t_idx] == enemy_id:
+            enemy_tiles = -1 if defenders <= troops else 0
+            enemy_troops = -min(defenders, troops)
+
+        return my_tiles, my_troops, enemy_tiles, enemy_troops
+
     def production_move(self, source_tile: Tuple[int, int]) -> None:
         player = self.get_player(self.player_id)
 
-        s_i, s_j = source_tile
-        self.map_troops[s_i, s_j] += 1
+        s_idx = Game.TileNumbers[source_tile]
+        self.set_tile(s_idx, int(self.map_owners[s_idx]), int(self.map_troops[s_idx]) + 1)
 
         player.production_moves += 1
 
+        if Game.Debug:
+            self.check_counters()
+
     def is_production_move_valid(self, source_tile: Tuple[int, int]) -> bool:
-        my_tiles = self.get_tiles(self.player_id)
+        s_idx = Game.TileNumbers.get(source_tile)
 
-        if source_tile not in my_tiles:
+        if s_idx is None or self.map_owners[s_idx] != self.player_id:
             return False
 
-        s_i, s_j = source_tile
-
-        if self.map_troops[s_i, s_j] >= Game.TileTroopMax:
+        if self.map_troops[s_idx] >= Game.TileTroopMax:
             return False
 
         return True
@@ -166,46 +464,52 @@ class Game:
     def attack_move(self, source_tile: Tuple[int, int], target_tile: Tuple[int, int], attackers: int) -> None:
         player = self.get_player(self.player_id)
 
-        s_i, s_j = source_tile
-        t_i, t_j = target_tile
+        s_idx = Game.TileNumbers[source_tile]
+        t_idx = Game.TileNumbers[target_tile]
 
-        self.map_troops[s_i, s_j] -= attackers
+        source_owner = int(self.map_owners[s_idx])
+        source_troops = int(self.map_troops[s_idx]) - attackers
 
-        if self.map_troops[s_i, s_j] < Game.TileTroopMin:
-            self.map_owners[s_i, s_j] = Game.NaturePlayer
+        if source_troops < Game.TileTroopMin:
+            source_owner = Game.NaturePlayer
 
-        defenders = self.map_troops[t_i, t_j]
+        self.set_tile(s_idx, source_owner, source_troops)
+
+        target_owner = int(self.map_owners[t_idx])
+        defenders = int(self.map_troops[t_idx])
 
         if defenders < attackers:
-            self.map_owners[t_i, t_j] = self.player_id
+            target_owner = self.player_id
+
+        target_troops = abs(defenders - attackers)
 
-        self.map_troops[t_i, t_j] = abs(defenders - attackers)
+        if target_troops < Game.TileTroopMin:
+            target_owner = Game.NaturePlayer
 
-        if self.map_troops[t_i, t_j] < Game.TileTroopMin:
-            self.map_owners[t_i, t_j] = Game.NaturePlayer
+        self.set_tile(t_idx, target_owner, target_troops)
 
         player.attack_moves += 1
 
+        if Game.Debug:
+            self.check_counters()
+
     def is_attack_move_valid(self, source_tile: Tuple[int, int], target_tile: Tuple[int, int], attackers: int) -> bool:
-        my_tiles = self.get_tiles(self.player_id)
+        s_idx = Game.TileNumbers.get(source_tile)
+        t_idx = Game.TileNumbers.get(target_tile)
 
-        if source_tile not in my_tiles:
+        if s_idx is None or self.map_owners[s_idx] != self.player_id:
             return False
 
-        if target_tile in my_tiles:
+        if t_idx is None or self.map_owners[t_idx] == self.player_id:
             return False
 
-        adjacent = self.get_tile_adj(source_tile)
-
-        if target_tile not in adjacent:
+        if t_idx not in Game.TileAdjIndices[s_idx]:
             return False
 
-        s_i, s_j = source_tile
-
         if attackers < Game.TileTroopMin or attackers > Game.TileTroopMax:
             return False
 
-        if self.map_troops[s_i, s_j] < attackers:
+        if self.map_troops[s_idx] < attackers:
             return False
 
         return True
@@ -213,124 +517,77 @@ class Game:
     def transport_move(self, source_tile: Tuple[int, int], target_tile: Tuple[int, int], transport: int) -> None:
         player = self.get_player(self.player_id)
 
-        s_i, s_j = source_tile
-        t_i, t_j = target_tile
+        s_idx = Game.TileNumbers[source_tile]
+        t_idx = Game.TileNumbers[target_tile]
 
-        self.map_troops[s_i, s_j] -= transport
+        source_owner = int(self.map_owners[s_idx])
+        source_troops = int(self.map_troops[s_idx]) - transport
 
-        if self.map_troops[s_i, s_j] < Game.TileTroopMin:
-            self.map_owners[s_i, s_j] = Game.NaturePlayer
+        if source_troops < Game.TileTroopMin:
+            source_owner = Game.NaturePlayer
 
-        self.map_troops[t_i, t_j] += transport
+        self.set_tile(s_idx, source_owner, source_troops)
+        self.set_tile(t_idx, int(self.map_owners[t_idx]), int(self.map_troops[t_idx]) + transport)
 
         player.transport_moves += 1
 
+        if Game.Debug:
+            self.check_counters()
+
     def is_transport_move_valid(self, source_tile: Tuple[int, int], target_tile: Tuple[int, int],
                                 transport: int) -> bool:
-        my_tiles = self.get_tiles(self.player_id)
+        s_idx = Game.TileNumbers.get(source_tile)
+        t_idx = Game.TileNumbers.get(target_tile)
 
-        if source_tile not in my_tiles:
+        if s_idx is None or self.map_owners[s_idx] != self.player_id:
             return False
 
-        if target_tile not in my_tiles:
+        if t_idx is None or self.map_owners[t_idx] != self.player_id:
             return False
 
-        if source_tile == target_tile:
-            return False
-
-        s_i, s_j = source_tile
-        t_i, t_j = target_tile
-
-        if abs(s_i - t_i) > 1 or abs(s_j - t_j) > 1:
+        if t_idx not in Game.TileReachIndices[s_idx]:
             return False
 
         if transport < Game.TileTroopMin or transport > Game.TileTroopMax:
             return False
 
-        if self.map_troops[s_i, s_j] < transport:
+        if self.map_troops[s_idx] < transport:
             return False
 
-        if self.map_troops[t_i, t_j] + transport > Game.TileTroopMax:
+        if self.map_troops[t_idx] + transport > Game.TileTroopMax:
             return False
 
         return True
 
     def get_tile_owner(self, tile: Tuple[int, int]) -> int:
-        return self.map_owners[tile[0], tile[1]]
+        return int(self.map_owners[Game.TileNumbers[tile]])
 
     def get_tile_count(self, player_id: int) -> int:
-        return len(self.get_tiles(player_id))
+        return self.tile_counts[player_id]
 
     def get_troop_count(self, player_id: int) -> int:
-        tiles = self.get_tiles(player_id)
-        return int(np.sum([self.get_tile_troops(tile) for tile in tiles]).item())
+        return self.troop_counts[player_id]
 
     def get_tile_troops(self, tile: Tuple[int, int]) -> int:
-        return self.map_troops[tile[0], tile[1]].item()
+        return int(self.map_troops[Game.TileNumbers[tile]])
 
     @staticmethod
     def get_tile_coords(index: int) -> Tuple[int, int]:
-        return [(i, j) for i in range(Game.MapWidth) for j in range(Game.MapHeight)][index]
+        return Game.TileCoords[index]
 
     def get_tiles(self, player_id: int) -> List[Tuple[int, int]]:
-        results = np.argwhere(self.map_owners == player_id)
-        return [tuple(result) for result in results]
+        return [Game.TileCoords[index] for index in self.get_tile_indices(player_id)]
+
+    def get_tile_indices(self, player_id: int) -> ndarray:
+        return np.flatnonzero(self.map_owners == player_id)
 
     @staticmethod
-    def get_tile_number(coords: Tuple[int, int]):
-        lookup = {
-            (0, 0): 0, (0, 1): 1, (0, 2): 2, (0, 3): 3, (0, 4): 4, (0, 5): 5,
-            (1, 0): 6, (1, 1): 7, (1, 2): 8, (1, 3): 9, (1, 4): 10, (1, 5): 11,
-            (2, 0): 12, (2, 1): 13, (2, 2): 14, (2, 3): 15, (2, 4): 16, (2, 5): 17,
-            (3, 0): 18, (3, 1): 19, (3, 2): 20, (3, 3): 21, (3, 4): 22, (3, 5): 23,
-            (4, 0): 24, (4, 1): 25, (4, 2): 26, (4, 3): 27, (4, 4): 28, (4, 5): 29,
-            (5, 0): 30, (5, 1): 31, (5, 2): 32, (5, 3): 33, (5, 4): 34, (5, 5): 35,
-        }
-
-        return lookup[coords]
+    def get_tile_number(coords: Tuple[int, int]) -> int:
+        return Game.TileNumbers[coords]
 
     @staticmethod
     def get_tile_adj(tile: Tuple[int, int]) -> List[Tuple[int, int]]:
-        lookup = {
-            (0, 0): [(0, 1), (1, 0)],
-            (0, 1): [(0, 0), (0, 2), (1, 0), (1, 1)],
-            (0, 2): [(0, 1), (1, 1), (1, 2), (0, 3)],
-            (0, 3): [(0, 2), (1, 2), (1, 3), (0, 4)],
-            (0, 4): [(0, 3), (1, 3), (1, 4), (0, 5)],
-            (0, 5): [(0, 4), (1, 4), (1, 5)],
-            (1, 0): [(0, 0), (0, 1), (1, 1), (2, 0), (2, 1)],
-            (1, 1): [(0, 1), (0, 2), (1, 0), (1, 2), (2, 1), (2, 2)],
-            (1, 2): [(0, 2), (0, 3), (1, 1), (1, 3), (2, 2), (2, 3)],
-            (1, 3): [(0, 3), (0, 4), (1, 2), (1, 4), (2, 3), (2, 4)],
-            (1, 4): [(0, 4), (0, 5), (1, 3), (1, 5), (2, 4), (2, 5)],
-            (1, 5): [(0, 5), (1, 4), (2, 5)],
-            (2, 0): [(1, 0), (2, 1), (3, 0)],
-            (2, 1): [(1, 0), (1, 1), (2, 0), (2, 2), (3, 0), (3, 1)],
-            (2, 2): [(1, 1), (1, 2), (2, 1), (2, 3), (3, 1), (3, 2)],
-            (2, 3): [(1, 2), (1, 3), (2, 2), (2, 4), (3, 2), (3, 3)],
-            (2, 4): [(1, 3), (1, 4), (2, 3), (2, 5), (3, 3), (3, 4)],
-            (2, 5): [(1, 4), (1, 5), (2, 4), (3, 4), (3, 5)],
-            (3, 0): [(2, 0), (2, 1), (3, 1), (4, 0), (4, 1)],
-            (3, 1): [(2, 1), (2, 2), (3, 0), (3, 2), (4, 1), (4, 2)],
-            (3, 2): [(2, 2), (2, 3), (3, 1), (3, 3), (4, 2), (4, 3)],
-            (3, 3): [(2, 3), (2, 4), (3, 2), (3, 4), (4, 3), (4, 4)],
-            (3, 4): [(2, 4), (2, 5), (3, 3), (3, 5), (4, 4), (4, 5)],
-            (3, 5): [(2, 5), (3, 4), (4, 5)],
-            (4, 0): [(3, 0), (4, 1), (5, 0)],
-            (4, 1): [(3, 0), (3, 1), (4, 0), (4, 2), (5, 0), (5, 1)],
-            (4, 2): [(3, 1), (3, 2), (4, 1), (4, 3), (5, 1), (5, 2)],
-            (4, 3): [(3, 2), (3, 3), (4, 2), (4, 4), (5, 2), (5, 3)],
-            (4, 4): [(3, 3), (3, 4), (4, 3), (4, 5), (5, 3), (5, 4)],
-            (4, 5): [(3, 4), (3, 5), (4, 4), (5, 4), (5, 5)],
-            (5, 0): [(4, 0), (4, 1), (5, 1)],
-            (5, 1): [(4, 1), (4, 2), (5, 0), (5, 2)],
-            (5, 2): [(4, 2), (4, 3), (5, 1), (5, 3)],
-            (5, 3): [(4, 3), (4, 4), (5, 2), (5, 4)],
-            (5, 4): [(4, 4), (4, 5), (5, 3), (5, 5)],
-            (5, 5): [(4, 5), (5, 4)],
-        }
-
-        return lookup[tile]
+        return Game.TileAdj[tile]
 
     def __str__(self):
         blue_tiles = self.get_tile_count(Game.BluePlayer)
@@ -0,0 +1,12 @@
+from typing import NamedTuple, Dict
+
+from numpy import ndarray
+
+
+class GameEpisode(NamedTuple):
+    seed: int
+    map_owners: ndarray
+    map_troops: ndarray
+    random_state: Dict
+    red_tiles: int
+    red_troops: int
@@ -1,6 +1,6 @@
 import os
 from collections import defaultdict
-from typing import Tuple, Dict
+from typing import Tuple, Dict, TYPE_CHECKING
 
 import matplotlib.pyplot as plt
 from matplotlib.axes import Axes
@@ -9,6 +9,9 @@ from matplotlib.patches import RegularPolygon
 
 from game_map_tile import GameMapTile
 
+if TYPE_CHECKING:
+    from game_move import GameMove
+
 
 class GameMap:
     SavePath = '/media/thanos/Thanos Paravantis/thesis'
@@ -233,7 +236,7 @@ class GameMap:
         if show:
             plt.pause(0.001)
 
-    def save(self, player_move: Dict = None, render: bool = True) -> None:
+    def save(self, player_move: 'GameMove' = None, render: bool = True) -> None:
 
         if not os.path.isdir(self.save_path):
             os.mkdir(self.save_path)
@@ -247,6 +250,6 @@ class GameMap:
             game_file = f'round-{rounds}-player-{player_id}'
 
         if render:
-            self.render(player_move=player_move, show=False)
+            self.render(player_move=player_move.to_dict() if player_move is not None else None, show=False)
 
         self.figure.savefig(f'{self.save_path}/{game_file}.png')
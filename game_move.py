@@ -0,0 +1,12 @@
+from typing import NamedTuple, Tuple, Dict
+
+
+class GameMove(NamedTuple):
+    move_type: int
+    source_tile: Tuple[int, int]
+    target_tile: Tuple[int, int]
+    troops: int
+    guided: bool
+
+    def to_dict(self) -> Dict:
+        return dict(self._asdict())
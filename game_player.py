@@ -7,3 +7,10 @@ class GamePlayer:
         self.transport_moves = 0
         self.guided_moves = 0
         self.per_move_fitness = []
+
+    def reset(self) -> None:
+        self.production_moves = 0
+        self.attack_moves = 0
+        self.transport_moves = 0
+        self.guided_moves = 0
+        self.per_move_fitness = []
@@ -1,14 +1,17 @@
-from typing import Tuple
+from typing import Tuple, TYPE_CHECKING
 
 import numpy as np
 from numpy import ndarray
 
 from game import Game
 
+if TYPE_CHECKING:
+    from batch_game import BatchGame
+
 
 class BlueExpandAlone(Game):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, headless: bool = False):
+        super().__init__(headless)
 
     def get_map(self) -> Tuple[ndarray, ndarray]:
         map_owners = np.array([
@@ -46,6 +49,48 @@ class BlueExpandAlone(Game):
 
         return sum([game_won_time, my_tiles_gained])
 
+    def get_batch_fitness(self, batch: 'BatchGame') -> ndarray:
+        nature_start_tiles = 36
+        nature_tiles = batch.get_tile_counts(Game.NaturePlayer)
+        blue_won = batch.get_winners() == Game.BluePlayer
+        rounds = batch.rounds
+        max_rounds = self.get_max_rounds()
+
+        game_won_time = np.where(blue_won, ((np.abs(rounds - max_rounds) / max_rounds) ** 2) * 50, 0)
+        my_tiles_gained = (((nature_start_tiles - nature_tiles) / nature_start_tiles) ** 2) * 50
+
+        return game_won_time + my_tiles_gained
+
+    def get_fitness_bound(self) -> float:
+        nature_start_tiles = 36
+        nature_tiles = self.get_tile_count(Game.NaturePlayer)
+        rounds = self.rounds
+        max_rounds = self.get_max_rounds()
+
+        # Blue captures at most one tile per round.
+        nature_tiles_left = max(nature_tiles - (max_rounds - rounds), 0)
+        blue_can_win = nature_tiles_left == 0
+
+        game_won_time = (((abs(rounds + nature_tiles - max_rounds) / max_rounds) ** 2) * 50) if blue_can_win else 0
+        my_tiles_gained = (((nature_start_tiles - nature_tiles_left) / nature_start_tiles) ** 2) * 50
+
+        return sum([game_won_time, my_tiles_gained])
+
+    def get_batch_fitness_bound(self, batch: 'BatchGame') -> ndarray:
+        nature_start_tiles = 36
+        nature_tiles = batch.get_tile_counts(Game.NaturePlayer)
+        rounds = batch.rounds
+        max_rounds = self.get_max_rounds()
+
+        nature_tiles_left = np.maximum(nature_tiles - (max_rounds - rounds), 0)
+        blue_can_win = nature_tiles_left == 0
+
+        game_won_time = np.where(blue_can_win,
+                                 ((np.abs(rounds + nature_tiles - max_rounds) / max_rounds) ** 2) * 50, 0)
+        my_tiles_gained = (((nature_start_tiles - nature_tiles_left) / nature_start_tiles) ** 2) * 50
+
+        return game_won_time + my_tiles_gained
+
     def is_red_simulated(self) -> bool:
         return False
 
@@ -54,16 +99,24 @@ class BlueExpandAlone(Game):
                or self.get_tile_count(Game.NaturePlayer) == 0 \
                or self.is_state_repeated()
 
+    def has_batch_ended(self, batch: 'BatchGame') -> ndarray:
+        return (batch.rounds >= self.get_max_rounds()) \
+               | (batch.get_tile_counts(Game.NaturePlayer) == 0) \
+               | batch.is_state_repeated()
+
     def get_winner(self) -> int:
         if self.get_tile_count(Game.NaturePlayer) == 0:
             return Game.BluePlayer
         else:
             return Game.NaturePlayer
 
+    def get_batch_winner(self, batch: 'BatchGame') -> ndarray:
+        return np.where(batch.get_tile_counts(Game.NaturePlayer) == 0, Game.BluePlayer, Game.NaturePlayer)
+
 
 class BlueBeatRedEasy(Game):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, headless: bool = False):
+        super().__init__(headless)
 
     def get_map(self) -> Tuple[ndarray, ndarray]:
         map_owners = np.array([
@@ -90,8 +143,8 @@ class BlueBeatRedEasy(Game):
         return 500
 
     def get_fitness(self) -> float:
-        enemy_start_tiles = 6
-        enemy_start_troops = 40
+        enemy_start_tiles = self.red_start_tiles
+        enemy_start_troops = self.red_start_troops
         enemy_tiles = self.get_tile_count(Game.RedPlayer)
         enemy_troops = self.get_troop_count(Game.RedPlayer)
         blue_won = self.get_winner() == Game.BluePlayer
@@ -108,13 +161,65 @@ class BlueBeatRedEasy(Game):
             enemy_tiles_lost, enemy_troops_lost
         ])
 
+    def get_batch_fitness(self, batch: 'BatchGame') -> ndarray:
+        enemy_start_tiles = batch.red_start_tiles
+        enemy_start_troops = batch.red_start_troops
+        enemy_tiles = batch.get_tile_counts(Game.RedPlayer)
+        enemy_troops = batch.get_troop_counts(Game.RedPlayer)
+        blue_won = batch.get_winners() == Game.BluePlayer
+        rounds = batch.rounds
+        max_rounds = self.get_max_rounds()
+
+        game_won = np.where(blue_won, 20, 0)
+        game_won_time = np.where(blue_won, (np.abs(rounds - max_rounds) / max_rounds) * 30, 0)
+        enemy_tiles_lost = ((enemy_start_tiles - enemy_tiles) / enemy_start_tiles) * 30
+        enemy_troops_lost = ((enemy_start_troops - enemy_troops) / enemy_start_troops) * 20
+
+        return game_won + game_won_time + enemy_tiles_lost + enemy_troops_lost
+
+    def get_fitness_bound(self) -> float:
+        enemy_start_tiles = self.red_start_tiles
+        enemy_tiles = self.get_tile_count(Game.RedPlayer)
+        rounds = self.rounds
+        max_rounds = self.get_max_rounds()
+
+        # Red does not move, so it loses at most one tile per round and at most all of its troops.
+        enemy_tiles_left = max(enemy_tiles - (max_rounds - rounds), 0)
+        blue_can_win = enemy_tiles_left == 0
+
+        game_won = 20 if blue_can_win else 0
+        game_won_time = ((abs(rounds + enemy_tiles - max_rounds) / max_rounds) * 30) if blue_can_win else 0
+        enemy_tiles_lost = ((enemy_start_tiles - enemy_tiles_left) / enemy_start_tiles) * 30
+        enemy_troops_lost = 20
+
+        return sum([
+            game_won, game_won_time,
+            enemy_tiles_lost, enemy_troops_lost
+        ])
+
+    def get_batch_fitness_bound(self, batch: 'BatchGame') -> ndarray:
+        enemy_start_tiles = batch.red_start_tiles
+        enemy_tiles = batch.get_tile_counts(Game.RedPlayer)
+        rounds = batch.rounds
+        max_rounds = self.get_max_rounds()
+
+        enemy_tiles_left = np.maximum(enemy_tiles - (max_rounds - rounds), 0)
+        blue_can_win = enemy_tiles_left == 0
+
+        game_won = np.where(blue_can_win, 20, 0)
+        game_won_time = np.where(blue_can_win, (np.abs(rounds + enemy_tiles - max_rounds) / max_rounds) * 30, 0)
+        enemy_tiles_lost = ((enemy_start_tiles - enemy_tiles_left) / enemy_start_tiles) * 30
+        enemy_troops_lost = 20
+
+        return game_won + game_won_time + enemy_tiles_lost + enemy_troops_lost
+
     def is_red_simulated(self) -> bool:
         return False
 
 
 class BlueBeatRedHard(Game):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, headless: bool = False):
+        super().__init__(headless)
 
     def get_map(self) -> Tuple[ndarray, ndarray]:
         map_owners = np.zeros((Game.MapWidth, Game.MapHeight), dtype='uint8')
@@ -137,8 +242,8 @@ class BlueBeatRedHard(Game):
         return 5000
 
     def get_fitness(self) -> float:
-        enemy_start_tiles = 19
-        enemy_start_troops = 222
+        enemy_start_tiles = self.red_start_tiles
+        enemy_start_troops = self.red_start_troops
         enemy_tiles = self.get_tile_count(Game.RedPlayer)
         enemy_troops = self.get_troop_count(Game.RedPlayer)
         blue_won = self.get_winner() == Game.BluePlayer
@@ -155,6 +260,58 @@ class BlueBeatRedHard(Game):
             enemy_tiles_lost, enemy_troops_lost
         ])
 
+    def get_batch_fitness(self, batch: 'BatchGame') -> ndarray:
+        enemy_start_tiles = batch.red_start_tiles
+        enemy_start_troops = batch.red_start_troops
+        enemy_tiles = batch.get_tile_counts(Game.RedPlayer)
+        enemy_troops = batch.get_troop_counts(Game.RedPlayer)
+        blue_won = batch.get_winners() == Game.BluePlayer
+        rounds = batch.rounds
+        max_rounds = self.get_max_rounds()
+
+        game_won = np.where(blue_won, 20, 0)
+        game_won_time = np.where(blue_won, (np.abs(rounds - max_rounds) / max_rounds) * 30, 0)
+        enemy_tiles_lost = ((enemy_start_tiles - enemy_tiles) / enemy_start_tiles) * 30
+        enemy_troops_lost = ((enemy_start_troops - enemy_troops) / enemy_start_troops) * 20
+
+        return game_won + game_won_time + enemy_tiles_lost + enemy_troops_lost
+
+    def get_fitness_bound(self) -> float:
+        enemy_start_tiles = self.red_start_tiles
+        enemy_tiles = self.get_tile_count(Game.RedPlayer)
+        rounds = self.rounds
+        max_rounds = self.get_max_rounds()
+
+        # Red does not move, so it loses at most one tile per round and at most all of its troops.
+        enemy_tiles_left = max(enemy_tiles - (max_rounds - rounds), 0)
+        blue_can_win = enemy_tiles_left == 0
+
+        game_won = 20 if blue_can_win else 0
+        game_won_time = ((abs(rounds + enemy_tiles - max_rounds) / max_rounds) * 30) if blue_can_win else 0
+        enemy_tiles_lost = ((enemy_start_tiles - enemy_tiles_left) / enemy_start_tiles) * 30
+        enemy_troops_lost = 20
+
+        return sum([
+            game_won, game_won_time,
+            enemy_tiles_lost, enemy_troops_lost
+        ])
+
+    def get_batch_fitness_bound(self, batch: 'BatchGame') -> ndarray:
+        enemy_start_tiles = batch.red_start_tiles
+        enemy_tiles = batch.get_tile_counts(Game.RedPlayer)
+        rounds = batch.rounds
+        max_rounds = self.get_max_rounds()
+
+        enemy_tiles_left = np.maximum(enemy_tiles - (max_rounds - rounds), 0)
+        blue_can_win = enemy_tiles_left == 0
+
+        game_won = np.where(blue_can_win, 20, 0)
+        game_won_time = np.where(blue_can_win, (np.abs(rounds + enemy_tiles - max_rounds) / max_rounds) * 30, 0)
+        enemy_tiles_lost = ((enemy_start_tiles - enemy_tiles_left) / enemy_start_tiles) * 30
+        enemy_troops_lost = 20
+
+        return game_won + game_won_time + enemy_tiles_lost + enemy_troops_lost
+
     def is_red_simulated(self) -> bool:
         return False
 
@@ -173,3 +330,43 @@ class BlueAgainstRed(Game):
         tiles_gained = (my_tiles / Game.MapSize) * 50
 
         return sum([game_won_time, tiles_gained])
+
+    def get_batch_fitness(self, batch: 'BatchGame') -> ndarray:
+        my_tiles = batch.get_tile_counts(Game.BluePlayer)
+        blue_won = batch.get_winners() == Game.BluePlayer
+        rounds = batch.rounds
+        max_rounds = self.get_max_rounds()
+
+        game_won_time = np.where(blue_won, (np.abs(rounds - max_rounds) / max_rounds) * 50, 0)
+        tiles_gained = (my_tiles / Game.MapSize) * 50
+
+        return game_won_time + tiles_gained
+
+    def get_fitness_bound(self) -> float:
+        my_tiles = self.get_tile_count(Game.BluePlayer)
+        enemy_tiles = self.get_tile_count(Game.RedPlayer)
+        rounds = self.rounds
+        max_rounds = self.get_max_rounds()
+        remaining_rounds = max_rounds - rounds
+
+        # Blue captures at most one tile per round and red can empty at most one of its own tiles per round.
+        blue_can_win = enemy_tiles <= 2 * remaining_rounds
+
+        game_won_time = ((abs(rounds - max_rounds) / max_rounds) * 50) if blue_can_win else 0
+        tiles_gained = (min(my_tiles + remaining_rounds, Game.MapSize) / Game.MapSize) * 50
+
+        return sum([game_won_time, tiles_gained])
+
+    def get_batch_fitness_bound(self, batch: 'BatchGame') -> ndarray:
+        my_tiles = batch.get_tile_counts(Game.BluePlayer)
+        enemy_tiles = batch.get_tile_counts(Game.RedPlayer)
+        rounds = batch.rounds
+        max_rounds = self.get_max_rounds()
+        remaining_rounds = max_rounds - rounds
+
+        blue_can_win = enemy_tiles <= 2 * remaining_rounds
+
+        game_won_time = np.where(blue_can_win, (np.abs(rounds - max_rounds) / max_rounds) * 50, 0)
+        tiles_gained = (np.minimum(my_tiles + remaining_rounds, Game.MapSize) / Game.MapSize) * 50
+
+        return game_won_time + tiles_gained
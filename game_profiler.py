@@ -0,0 +1,141 @@
+import functools
+import json
+import os
+import time
+from typing import Callable, Dict, Optional
+
+from neat.reporting import BaseReporter
+
+from batch_game import BatchGame
+from compiled_network import CompiledNetwork, BatchNetwork
+from game import Game
+from state_parser import StateParser
+
+
+class GameProfiler:
+    Phases = [
+        'encode_state',
+        'activate',
+        'decode_state',
+        'guide_move',
+        'get_next_moves',
+        'apply_move',
+        'save_state',
+        'has_ended',
+        'simulate_move',
+    ]
+
+    def __init__(self):
+        self.times = {}  # type: Dict[str, float]
+        self.calls = {}  # type: Dict[str, int]
+        self.games = 0
+        self.reset()
+
+    def reset(self) -> None:
+        self.times = {phase: 0.0 for phase in GameProfiler.Phases}
+        self.calls = {phase: 0 for phase in GameProfiler.Phases}
+        self.games = 0
+
+    def wrap(self, function: Callable, phase: str) -> Callable:
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.times[phase] += time.perf_counter() - start
+                self.calls[phase] += 1
+
+        return timed
+
+    def instrument_networks(self) -> None:
+        CompiledNetwork.activate = self.wrap(CompiledNetwork.activate, 'activate')
+        BatchNetwork.activate = self.wrap(BatchNetwork.activate, 'activate')
+
+    def instrument_moves(self) -> None:
+        # Scalar and batch games both reach the shared move generator, cached lookups are counted as well.
+        StateParser.Moves.get_board_moves = self.wrap(StateParser.Moves.get_board_moves, 'get_next_moves')
+
+    def instrument_game(self, game: Game) -> None:
+        state_parser = game.state_parser
+
+        for phase in ['encode_state', 'decode_state', 'guide_move', 'simulate_move']:
+            setattr(state_parser, phase, self.wrap(getattr(state_parser, phase), phase))
+
+        for method in ['production_move', 'attack_move', 'transport_move']:
+            setattr(game, method, self.wrap(getattr(game, method), 'apply_move'))
+
+        game.save_state = self.wrap(game.save_state, 'save_state')
+        game.has_ended = self.wrap(game.has_ended, 'has_ended')
+
+    def instrument_batch(self, batch: BatchGame) -> None:
+        self.instrument_game(batch.game)
+
+        batch.get_inputs = self.wrap(batch.get_inputs, 'encode_state')
+        batch.decode_moves = self.wrap(batch.decode_moves, 'decode_state')
+        batch.guide_moves = self.wrap(batch.guide_moves, 'guide_move')
+        batch.simulate_moves = self.wrap(batch.simulate_moves, 'simulate_move')
+        batch.play_moves = self.wrap(batch.play_moves, 'apply_move')
+        batch.save_state = self.wrap(batch.save_state, 'save_state')
+        batch.end_games = self.wrap(batch.end_games, 'has_ended')
+
+    def collect(self, games: int) -> Dict:
+        profile = {
+            'games': games,
+            'times': self.times,
+            'calls': self.calls,
+        }
+
+        self.reset()
+        return profile
+
+    def merge(self, profile: Dict) -> None:
+        self.games += profile['games']
+
+        for phase in GameProfiler.Phases:
+            self.times[phase] += profile['times'][phase]
+            self.calls[phase] += profile['calls'][phase]
+
+    def to_json(self) -> Dict:
+        return {
+            'games': self.games,
+            'phases': {
+                phase: {'time': self.times[phase], 'calls': self.calls[phase]} for phase in GameProfiler.Phases
+            },
+        }
+
+    def __str__(self):
+        lines = [f'Game profile ({self.games} games, phase times include nested phases):']
+
+        for phase in GameProfiler.Phases:
+            calls = self.calls[phase]
+            per_call = self.times[phase] / calls * 1e6 if calls > 0 else 0.0
+            lines.append(f'{"":4}{phase:<16}{self.times[phase]:>10.3f} sec'
+                         f'{"":4}{calls:>10} calls'
+                         f'{"":4}{per_call:>10.2f} us/call')
+
+        return '\n'.join(lines)
+
+
+class ProfileReporter(BaseReporter):
+    def __init__(self, preset: int, profiler: GameProfiler):
+        self.folder = f'./profiles-{preset}'
+        self.profiler = profiler
+        self.generation = None  # type: Optional[int]
+
+    def start_generation(self, generation):
+        self.generation = generation
+        self.profiler.reset()
+
+    def post_evaluate(self, config, population, species, best_genome):
+        print(self.profiler)
+
+        if not os.path.isdir(self.folder):
+            os.mkdir(self.folder)
+
+        profile_json = {'generation': self.generation}
+        profile_json.update(self.profiler.to_json())
+
+        with open(f'{self.folder}/profile-{self.generation}.json', 'w') as file:
+            json.dump(profile_json, file, indent=2)
@@ -20,7 +20,9 @@ class GameResult:
             self.red_transport_moves = game_json['red_transport_moves']
             self.blue_guided_moves = game_json['blue_guided_moves'] if 'blue_guided_moves' in game_json else 0
             self.red_guided_moves = game_json['red_guided_moves'] if 'red_guided_moves' in game_json else 0
+            self.skipped_rounds = game_json['skipped_rounds'] if 'skipped_rounds' in game_json else 0
             self.fitness = game_json['fitness']
+            self.episode_fitness = game_json['episode_fitness'] if 'episode_fitness' in game_json else [self.fitness]
             self.winner = game_json['winner']
         else:
             self.genome_key = genome.key
@@ -37,7 +39,9 @@ class GameResult:
             self.red_transport_moves = game.red_player.transport_moves
             self.blue_guided_moves = game.blue_player.guided_moves
             self.red_guided_moves = game.red_player.guided_moves
+            self.skipped_rounds = game.skipped_rounds
             self.fitness = game.get_fitness()
+            self.episode_fitness = [self.fitness]
 
             winner_id = game.get_winner()
 
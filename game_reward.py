@@ -0,0 +1,149 @@
+from typing import List, Tuple
+
+import numpy as np
+from numpy import ndarray
+
+DefaultPayoff = [
+    (-1, 0, 0, 0),
+    (0, 0, 0, 0),
+    (0, 1, 0, 0),
+    (1, 0, 0, 0),
+    (-1, -1, 0, -1),
+    (-1, -2, 0, -2),
+    (-1, -3, 0, -3),
+    (-1, -4, 0, -4),
+    (-1, -5, 0, -5),
+    (-1, -6, 0, -6),
+    (-1, -7, 0, -7),
+    (-1, -8, 0, -8),
+    (-1, -9, 0, -9),
+    (-1, -10, 0, -10),
+    (-1, -11, 0, -11),
+    (-1, -12, 0, -12),
+    (-1, -13, 0, -13),
+    (-1, -14, 0, -14),
+    (-1, -15, 0, -15),
+    (-1, -16, 0, -16),
+    (-1, -17, 0, -17),
+    (-1, -18, 0, -18),
+    (-1, -19, 0, -19),
+    (0, -1, 0, -1),
+    (0, -2, 0, -2),
+    (0, -3, 0, -3),
+    (0, -4, 0, -4),
+    (0, -5, 0, -5),
+    (0, -6, 0, -6),
+    (0, -7, 0, -7),
+    (0, -8, 0, -8),
+    (0, -9, 0, -9),
+    (0, -10, 0, -10),
+    (0, -11, 0, -11),
+    (0, -12, 0, -12),
+    (0, -13, 0, -13),
+    (0, -14, 0, -14),
+    (0, -15, 0, -15),
+    (0, -16, 0, -16),
+    (0, -17, 0, -17),
+    (0, -18, 0, -18),
+    (0, -19, 0, -19),
+    (0, -1, -1, -1),
+    (0, -2, -1, -2),
+    (0, -3, -1, -3),
+    (0, -4, -1, -4),
+    (0, -5, -1, -5),
+    (0, -6, -1, -6),
+    (0, -7, -1, -7),
+    (0, -8, -1, -8),
+    (0, -9, -1, -9),
+    (0, -10, -1, -10),
+    (0, -11, -1, -11),
+    (0, -12, -1, -12),
+    (0, -13, -1, -13),
+    (0, -14, -1, -14),
+    (0, -15, -1, -15),
+    (0, -16, -1, -16),
+    (0, -17, -1, -17),
+    (0, -18, -1, -18),
+    (0, -19, -1, -19),
+    (-1, -1, -1, -1),
+    (-1, -2, -1, -2),
+    (-1, -3, -1, -3),
+    (-1, -4, -1, -4),
+    (-1, -5, -1, -5),
+    (-1, -6, -1, -6),
+    (-1, -7, -1, -7),
+    (-1, -8, -1, -8),
+    (-1, -9, -1, -9),
+    (-1, -10, -1, -10),
+    (-1, -11, -1, -11),
+    (-1, -12, -1, -12),
+    (-1, -13, -1, -13),
+    (-1, -14, -1, -14),
+    (-1, -15, -1, -15),
+    (-1, -16, -1, -16),
+    (-1, -17, -1, -17),
+    (-1, -18, -1, -18),
+    (-1, -19, -1, -19),
+    (-1, -20, -1, -20),
+    (1, -1, -1, -1),
+    (1, -2, -1, -2),
+    (1, -3, -1, -3),
+    (1, -4, -1, -4),
+    (1, -5, -1, -5),
+    (1, -6, -1, -6),
+    (1, -7, -1, -7),
+    (1, -8, -1, -8),
+    (1, -9, -1, -9),
+    (1, -10, -1, -10),
+    (1, -11, -1, -11),
+    (1, -12, -1, -12),
+    (1, -13, -1, -13),
+    (1, -14, -1, -14),
+    (1, -15, -1, -15),
+    (1, -16, -1, -16),
+    (1, -17, -1, -17),
+    (1, -18, -1, -18),
+    (1, -19, -1, -19),
+]
+
+
+class RewardTable:
+    def __init__(self, payoff: List[Tuple[int, int, int, int]]):
+        payoff_dict = {}
+
+        for idx, key in enumerate(payoff):
+            payoff_dict[key] = idx + 1
+
+        keys = np.array(list(payoff_dict))
+        self.offsets = -keys.min(axis=0)
+        self.shape = keys.max(axis=0) + self.offsets + 1
+
+        # Delta combinations that are missing from the payoff have no reward.
+        self.table = np.full(self.shape, np.nan)
+
+        for key, value in payoff_dict.items():
+            self.table[tuple(np.add(key, self.offsets))] = value / len(payoff_dict)
+
+        self.offsets = self.offsets.tolist()
+        self.shape = self.shape.tolist()
+
+    def get_reward(self, deltas: Tuple[int, int, int, int]) -> float:
+        index = tuple(delta + offset for delta, offset in zip(deltas, self.offsets))
+
+        if any(idx < 0 or idx >= size for idx, size in zip(index, self.shape)) or np.isnan(self.table[index]):
+            raise KeyError(deltas)
+
+        return float(self.table[index])
+
+    def get_rewards(self, deltas: ndarray) -> ndarray:
+        indices = deltas + self.offsets
+
+        if np.any((indices < 0) | (indices >= self.shape)):
+            raise KeyError(deltas[np.any((indices < 0) | (indices >= self.shape), axis=1)][0])
+
+        rewards = self.table[tuple(indices.T)]
+
+        if np.any(np.isnan(rewards)):
+            raise KeyError(deltas[np.isnan(rewards)][0])
+
+        return rewards
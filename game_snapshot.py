@@ -0,0 +1,20 @@
+from typing import NamedTuple, Dict, List, Optional, Tuple
+
+from numpy import ndarray
+
+from game_episode import GameEpisode
+
+
+class GameSnapshot(NamedTuple):
+    episode: GameEpisode
+    map_owners: ndarray
+    map_troops: ndarray
+    rounds: int
+    skipped_rounds: int
+    state_counts: Dict[int, int]
+    random_state: Dict
+    player_moves: ndarray
+    per_move_fitness: List[List[float]]
+    stop_counters: Optional[Tuple[int, int, int, int]]
+    stop_stalls: int
+    paused: bool
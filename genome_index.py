@@ -0,0 +1,95 @@
+import hashlib
+import os
+import pickle
+import zlib
+from typing import Dict, List, Tuple, Optional
+
+from neat import DefaultGenome
+from neat.reporting import BaseReporter
+
+from checkpoint_writer import CheckpointWriter, write_file, append_file
+
+
+class GenomeIndex(BaseReporter):
+    def __init__(self, folder: str, writer: CheckpointWriter = None):
+        self.folder = folder
+        self.data_path = f'{folder}/genomes'
+        self.writer = writer
+        self.current_generation = None
+        self.ranges = {}  # type: Dict[str, Tuple[int, int]]
+
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+
+    def __getstate__(self):
+        # The index is pickled with the species set reporters, the writer thread stays behind.
+        state = self.__dict__.copy()
+        state['writer'] = None
+        state['ranges'] = {}
+        return state
+
+    def start_generation(self, generation):
+        self.current_generation = generation
+
+    def end_generation(self, config, population, species_set):
+        self.add_generation(self.current_generation, population)
+
+    @staticmethod
+    def get_index_path(folder: str, generation: int) -> str:
+        return f'{folder}/index-{generation}'
+
+    def has_generation(self, generation: int) -> bool:
+        return os.path.exists(GenomeIndex.get_index_path(self.folder, generation))
+
+    def add_generation(self, generation: int, population: Dict[int, DefaultGenome]) -> None:
+        genomes = [(key, pickle.dumps(genome, protocol=pickle.HIGHEST_PROTOCOL)) for key, genome in population.items()]
+
+        if self.writer is not None:
+            self.writer.submit(self.write_generation, generation, genomes)
+        else:
+            self.write_generation(generation, genomes)
+
+    def write_generation(self, generation: int, genomes: List[Tuple[int, bytes]]) -> None:
+        offset = os.path.getsize(self.data_path) if os.path.exists(self.data_path) else 0
+        chunks = []
+        lines = []
+
+        # Genomes carried over unchanged point at the bytes written for an earlier generation of this run.
+        for key, data in genomes:
+            genome_hash = hashlib.sha1(data).hexdigest()
+
+            if genome_hash not in self.ranges:
+                chunk = zlib.compress(data)
+                self.ranges[genome_hash] = (offset, len(chunk))
+                chunks.append(chunk)
+                offset += len(chunk)
+
+            lines.append(f'{key} {self.ranges[genome_hash][0]} {self.ranges[genome_hash][1]}\n')
+
+        # The genome bytes are on disk before the index that points at them.
+        append_file(self.data_path, b''.join(chunks))
+        write_file(GenomeIndex.get_index_path(self.folder, generation), ''.join(lines).encode())
+
+    @staticmethod
+    def read_genome(folder: str, generation: int, key: int) -> Optional[DefaultGenome]:
+        index_path = GenomeIndex.get_index_path(folder, generation)
+
+        if not os.path.exists(index_path):
+            return None
+
+        with open(index_path, 'r') as file:
+            for line in file:
+                genome_key, offset, length = map(int, line.split())
+
+                if genome_key == key:
+                    break
+            else:
+                return None
+
+        with open(f'{folder}/genomes', 'rb') as file:
+            file.seek(offset)
+            return pickle.loads(zlib.decompress(file.read(length)))
+
+
+def load_genome(preset: int, generation: int, key: int) -> Optional[DefaultGenome]:
+    return GenomeIndex.read_genome(f'./genome-index-{preset}', generation, key)
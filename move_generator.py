@@ -0,0 +1,129 @@
+from collections import OrderedDict
+from typing import Tuple, List
+
+import numpy as np
+from numpy import ndarray
+
+from game import Game
+
+
+def create_move_pairs() -> ndarray:
+    pairs = [(Game.ProductionMove, s_idx, s_idx) for s_idx in range(Game.MapSize)]
+
+    for s_idx in range(Game.MapSize):
+        for move_type in [Game.AttackMove, Game.TransportMove]:
+            for t_idx in Game.TileAdjIndices[s_idx]:
+                pairs.append((move_type, s_idx, t_idx))
+
+    return np.array(pairs)
+
+
+def create_move_candidates(pairs: ndarray, dtype: np.dtype) -> Tuple[ndarray, ndarray]:
+    candidates = []
+    candidate_pairs = []
+
+    for pair, (move_type, s_idx, t_idx) in enumerate(pairs.tolist()):
+        max_troops = 1 if move_type == Game.ProductionMove else Game.TileTroopMax
+
+        for troops in range(Game.TileTroopMin, max_troops + 1):
+            candidates.append((move_type, s_idx, t_idx, troops))
+            candidate_pairs.append(pair)
+
+    return np.array(candidates, dtype=dtype), np.array(candidate_pairs)
+
+
+class MoveGenerator:
+    MoveDtype = np.dtype([
+        ('move_type', np.int8),
+        ('source', np.int8),
+        ('target', np.int8),
+        ('troops', np.int8),
+    ])
+    Pairs = create_move_pairs()
+    Candidates, CandidatePairs = create_move_candidates(Pairs, MoveDtype)
+    # An entry holds the board bytes and its legal moves, about 2.2 KB, so ~9 MB per worker process.
+    DefaultMaxSize = 4096
+
+    def __init__(self, max_size: int = DefaultMaxSize):
+        self.max_size = max_size
+        self.entries = OrderedDict()  # type: OrderedDict[Tuple[int, int], Tuple[bytes, ndarray]]
+
+    @staticmethod
+    def get_move_mask(map_owners: ndarray, map_troops: ndarray, player_id: int) -> ndarray:
+        move_types, sources, targets = MoveGenerator.Pairs.T
+
+        # Boards may be stacked along leading axes, one mask row is returned per board.
+        owned = map_owners == player_id
+        source_owned = owned[..., sources]
+        target_owned = owned[..., targets]
+        source_troops = map_troops[..., sources].astype(int)
+        target_troops = map_troops[..., targets].astype(int)
+
+        # Every (type, source, target) pair gets the largest troop count it can move, zero when it is not legal.
+        production = (move_types == Game.ProductionMove) & source_owned & (source_troops < Game.TileTroopMax)
+
+        attack = (move_types == Game.AttackMove) & source_owned & ~target_owned \
+                 & Game.TileAdjMatrix[sources, targets]
+
+        transport = (move_types == Game.TransportMove) & source_owned & target_owned \
+                    & Game.TileReachMatrix[sources, targets]
+
+        limits = np.where(production, 1, 0)
+        limits = np.where(attack, source_troops, limits)
+        limits = np.where(transport, np.minimum(source_troops, Game.TileTroopMax - target_troops), limits)
+
+        return limits[..., MoveGenerator.CandidatePairs] >= MoveGenerator.Candidates['troops']
+
+    @staticmethod
+    def create_moves(map_owners: ndarray, map_troops: ndarray, player_id: int) -> ndarray:
+        return MoveGenerator.Candidates[MoveGenerator.get_move_mask(map_owners, map_troops, player_id)]
+
+    @staticmethod
+    def get_distances(moves: ndarray, sources: ndarray, targets: ndarray, troops: ndarray) -> ndarray:
+        return (moves['source'].astype(int) - sources) ** 2 \
+               + (moves['target'].astype(int) - targets) ** 2 \
+               + (moves['troops'].astype(int) - troops) ** 2
+
+    @staticmethod
+    def get_nearest_move(moves: ndarray, source: int, target: int, troops: int) -> ndarray:
+        return moves[np.argmin(MoveGenerator.get_distances(moves, source, target, troops))]
+
+    @staticmethod
+    def get_nearest_moves(moves_list: List[ndarray], sources: ndarray, targets: ndarray, troops: ndarray) -> ndarray:
+        lengths = [len(moves) for moves in moves_list]
+        offsets = np.cumsum([0] + lengths[:-1])
+        rows = np.repeat(np.arange(len(moves_list)), lengths)
+
+        moves = np.concatenate(moves_list)
+        distances = MoveGenerator.get_distances(moves, sources[rows], targets[rows], troops[rows])
+        minima = np.minimum.reduceat(distances, offsets)
+
+        # The first move at the minimum distance of each game wins, like argmin does for a single game.
+        positions = np.flatnonzero(distances == minima[rows])
+        first = np.unique(rows[positions], return_index=True)[1]
+
+        return moves[positions[first]]
+
+    def get_moves(self, game: Game) -> ndarray:
+        return self.get_board_moves(game.state_hash, game.map_owners, game.map_troops, game.player_id)
+
+    def get_board_moves(self, state_hash: int, map_owners: ndarray, map_troops: ndarray, player_id: int) -> ndarray:
+        key = (state_hash, player_id)
+        board = map_owners.tobytes() + map_troops.tobytes()
+        entry = self.entries.get(key)
+
+        # The state hash does not tell red and nature tiles apart, so the board is compared as well.
+        if entry is not None and entry[0] == board:
+            self.entries.move_to_end(key)
+            return entry[1]
+
+        moves = MoveGenerator.create_moves(map_owners, map_troops, player_id)
+        moves.flags.writeable = False
+
+        self.entries[key] = (board, moves)
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+        return moves
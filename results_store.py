@@ -0,0 +1,113 @@
+import os
+from typing import List, Dict
+
+import numpy as np
+from numpy import ndarray
+
+from checkpoint_writer import append_file
+from game_result import GameResult
+
+
+class ResultsStore:
+    Fields = {
+        'genome_key': np.int32,
+        'rounds': np.int32,
+        'blue_tiles': np.int8,
+        'red_tiles': np.int8,
+        'blue_troops': np.int16,
+        'red_troops': np.int16,
+        'blue_production_moves': np.int32,
+        'red_production_moves': np.int32,
+        'blue_attack_moves': np.int32,
+        'red_attack_moves': np.int32,
+        'blue_transport_moves': np.int32,
+        'red_transport_moves': np.int32,
+        'blue_guided_moves': np.int32,
+        'red_guided_moves': np.int32,
+        'skipped_rounds': np.int32,
+        'fitness': np.float64,
+        'winner': np.int8,
+    }
+    Winners = ['Tie', 'Blue', 'Red']
+    RecordDtype = np.dtype([('generation', np.int64), ('start', np.int64), ('count', np.int64)])
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.records_path = f'{folder}/generations'
+
+    def get_column_path(self, field: str) -> str:
+        return f'{self.folder}/{field}'
+
+    def get_records(self) -> ndarray:
+        if not os.path.exists(self.records_path):
+            return np.zeros(0, dtype=ResultsStore.RecordDtype)
+
+        # A record cut short by a crash is dropped, its rows are overwritten by the next append.
+        count = os.path.getsize(self.records_path) // ResultsStore.RecordDtype.itemsize
+        return np.fromfile(self.records_path, dtype=ResultsStore.RecordDtype, count=count)
+
+    def get_generations(self) -> ndarray:
+        # A generation that was evaluated again after a restart keeps its latest record.
+        records = self.get_records()
+        last = np.unique(records['generation'][::-1], return_index=True)[1]
+        return records[len(records) - 1 - last]
+
+    def append(self, generation: int, game_results: List[GameResult]) -> None:
+        if not os.path.isdir(self.folder):
+            os.makedirs(self.folder)
+
+        records = self.get_records()
+        start = int(np.max(records['start'] + records['count'])) if len(records) > 0 else 0
+
+        for field, dtype in ResultsStore.Fields.items():
+            path = self.get_column_path(field)
+
+            if field == 'winner':
+                values = [ResultsStore.Winners.index(game_result.winner) for game_result in game_results]
+            else:
+                values = [getattr(game_result, field) for game_result in game_results]
+
+            # Rows past the last record are left over from an append that never finished.
+            if os.path.exists(path):
+                os.truncate(path, start * np.dtype(dtype).itemsize)
+
+            append_file(path, np.array(values, dtype=dtype).tobytes())
+
+        # The record goes last, so readers never see rows that are not complete in every column.
+        record = np.array([(generation, start, len(game_results))], dtype=ResultsStore.RecordDtype)
+        append_file(self.records_path, record.tobytes())
+
+    def load(self, start: int = None, stop: int = None) -> Dict[str, ndarray]:
+        records = self.get_generations()
+
+        if start is not None:
+            records = records[records['generation'] >= start]
+
+        if stop is not None:
+            records = records[records['generation'] < stop]
+
+        rows = np.concatenate([np.arange(record['start'], record['start'] + record['count'])
+                               for record in records] + [np.zeros(0, dtype=int)])
+
+        columns = {'generation': np.repeat(records['generation'], records['count'])}
+
+        for field, dtype in ResultsStore.Fields.items():
+            path = self.get_column_path(field)
+
+            if len(rows) > 0:
+                columns[field] = np.array(np.memmap(path, dtype=dtype, mode='r')[rows])
+            else:
+                columns[field] = np.zeros(0, dtype=dtype)
+
+        return columns
+
+    def get_results(self, generation: int) -> List[GameResult]:
+        columns = self.load(generation, generation + 1)
+        game_results = []
+
+        for row in range(len(columns['generation'])):
+            game_json = {field: columns[field][row].item() for field in ResultsStore.Fields}
+            game_json['winner'] = ResultsStore.Winners[game_json['winner']]
+            game_results.append(GameResult(game_json=game_json))
+
+        return game_results
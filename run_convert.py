@@ -0,0 +1,32 @@
+import json
+import re
+
+from game_result import GameResult
+from results_store import ResultsStore
+from shared import get_folder_contents, print_signature, parse_args
+
+
+def main():
+    print_signature("Conversion Script")
+
+    args = parse_args("Convert the game result files of a preset to the columnar results store.")
+    preset = args.preset
+
+    store = ResultsStore(f'./results-store-{preset}')
+    generations = set(store.get_generations()['generation'].tolist())
+
+    for filename in get_folder_contents(f'./game-results-{preset}'):
+        match = re.fullmatch(r'game-result-(\d+)\.json', filename)
+
+        if not match or int(match.group(1)) in generations:
+            continue
+
+        with open(f'./game-results-{preset}/{filename}', 'r') as file:
+            game_results = [GameResult(game_json=game_json) for game_json in json.load(file)]
+
+        store.append(int(match.group(1)), game_results)
+        print(f'Converted game results: {filename} ({len(game_results)} results)')
+
+
+if __name__ == '__main__':
+    main()
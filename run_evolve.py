@@ -1,20 +1,49 @@
 from neat import DefaultGenome, DefaultReproduction, DefaultSpeciesSet, DefaultStagnation, Config
 
-from shared import pop_setup, print_signature, evaluate_fitness, parse_args
+from compiled_network import CompiledNetwork
+from early_stop import EarlyStop
+from episode_pool import EpisodePool
+from fitness_cache import FitnessCache
+from game_profiler import GameProfiler, ProfileReporter
+from shared import pop_setup, print_signature, evaluate_fitness, parse_args, pool_setup, game_setup
+from successive_halving import SuccessiveHalving
 
 
 def main():
     print_signature("Evolution Script")
 
-    args = parse_args("Evolves neural networks through generations with the NEAT algorithm.")
+    args = parse_args("Evolves neural networks through generations with the NEAT algorithm.", evolution=True)
 
     config = Config(DefaultGenome, DefaultReproduction, DefaultSpeciesSet, DefaultStagnation, './config')
 
     preset = args.preset
-    population = pop_setup(config, preset)
-
-    while True:
-        population.run(lambda genomes, config: evaluate_fitness(preset, population.generation, genomes, config), 1)
+    population = pop_setup(config, preset, use_store=args.store, use_index=args.index)
+    episode_pool = EpisodePool.load('./config', preset, game_setup(preset, headless=True))
+    fitness_cache = FitnessCache(preset, variant=episode_pool.get_variant() if episode_pool is not None else '') \
+        if args.cache else None
+    game_profiler = GameProfiler() if args.profile else None
+    early_stop = EarlyStop(args.stall_rounds, args.cutoff_quantile) \
+        if args.stall_rounds > 0 or args.cutoff_quantile is not None else None
+    successive_halving = SuccessiveHalving.load('./config')
+    network_dtype = CompiledNetwork.load_dtype('./config')
+
+    if successive_halving is not None:
+        print(f'Selected successive halving from {successive_halving.min_rounds} rounds')
+
+    if episode_pool is not None:
+        print(f'Selected {len(episode_pool.episodes)} episodes with {episode_pool.aggregate} fitness')
+
+    if network_dtype != 'float64':
+        print(f'Selected {network_dtype} networks')
+
+    if game_profiler is not None:
+        population.add_reporter(ProfileReporter(preset, game_profiler))
+
+    with pool_setup(config, args.profile, episode_pool, args.coordinator, network_dtype) as pool:
+        while True:
+            population.run(lambda genomes, config: evaluate_fitness(pool, preset, population.generation, genomes,
+                                                                      args.batch, fitness_cache, game_profiler,
+                                                                      early_stop, successive_halving), 1)
 
 
 if __name__ == '__main__':
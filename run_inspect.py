@@ -4,6 +4,8 @@ import os
 from neat import Config, DefaultGenome, DefaultReproduction, DefaultSpeciesSet, DefaultStagnation
 
 from game_result import GameResult
+from genome_index import load_genome
+from results_store import ResultsStore
 from shared import print_signature, pop_setup, play_game, game_setup, parse_args
 
 
@@ -13,7 +15,9 @@ def main():
     args = parse_args("Inspect neural networks through generations and save game plays.")
     preset = args.preset
 
-    file_count = len(os.listdir(f'./game-results-{preset}')) - 1
+    store = ResultsStore(f'./results-store-{preset}')
+    file_count = len(os.listdir(f'./game-results-{preset}')) - 1 if os.path.isdir(f'./game-results-{preset}') else -1
+    file_count = max([file_count] + store.get_generations()['generation'].tolist())
 
     if file_count < 0:
         raise Exception("No game results available.")
@@ -21,12 +25,15 @@ def main():
     ckp_number = int(input(f'Enter game result number (from 0 to {file_count}): '))
 
     config = Config(DefaultGenome, DefaultReproduction, DefaultSpeciesSet, DefaultStagnation, './config')
-    population = pop_setup(config, preset, ckp_number)
 
-    file = open(f'./game-results-{preset}/game-result-{ckp_number}.json', 'r')
-    game_results = json.load(file)
-    file.close()
-    game_results = [GameResult(game_json=game_json) for game_json in game_results]
+    # Generations whose game result file was removed after a conversion are read from the columnar store.
+    if os.path.exists(f'./game-results-{preset}/game-result-{ckp_number}.json'):
+        file = open(f'./game-results-{preset}/game-result-{ckp_number}.json', 'r')
+        game_results = json.load(file)
+        file.close()
+        game_results = [GameResult(game_json=game_json) for game_json in game_results]
+    else:
+        game_results = store.get_results(ckp_number)
 
     print()
 
@@ -37,7 +44,12 @@ def main():
 
     genome_key = input('Enter genome key: ')
 
-    genome = population.population[int(genome_key)]
+    genome = load_genome(preset, ckp_number, int(genome_key))
+
+    # Generations without a genome index still need their whole checkpoint.
+    if genome is None:
+        population = pop_setup(config, preset, ckp_number)
+        genome = population.population[int(genome_key)]
 
     game = game_setup(preset)
     play_game(genome, config, game, True)
@@ -0,0 +1,100 @@
+import argparse
+import gzip
+import os
+import pickle
+
+from checkpoint_store import CheckpointStore
+from checkpoint_writer import AsyncCheckpointer
+from genome_index import GenomeIndex
+from shared import print_signature, get_folder_contents
+
+
+def main():
+    print_signature("Checkpoint Store Script")
+
+    parser = argparse.ArgumentParser(description="Moves checkpoints between the pickle files and the checkpoint store.")
+
+    parser.add_argument(
+        '-p',
+        '--preset',
+        dest='preset',
+        metavar='ID',
+        type=int,
+        help='the preferred game preset to use for training',
+        required=True
+    )
+
+    parser.add_argument(
+        '--import',
+        dest='import_all',
+        action='store_true',
+        help='import every pickle checkpoint that is not in the store yet'
+    )
+
+    parser.add_argument(
+        '--index',
+        dest='index',
+        action='store_true',
+        help='add every checkpoint that is not indexed yet to the genome index'
+    )
+
+    parser.add_argument(
+        '--export',
+        dest='export',
+        metavar='N',
+        type=int,
+        default=None,
+        help='write the stored checkpoint of generation N back to a pickle checkpoint'
+    )
+
+    args = parser.parse_args()
+    preset = args.preset
+
+    print(f'Selected game preset: {preset}')
+
+    folder = f'./checkpoints-{preset}'
+    store_folder = f'./checkpoint-store-{preset}'
+
+    # Creating the store folder switches evolution over to the store, so only an import may do that.
+    store = CheckpointStore(store_folder) if args.import_all or os.path.isdir(store_folder) else None
+
+    if args.import_all:
+        generations = set(store.get_generations())
+
+        for filename in get_folder_contents(folder):
+            match = AsyncCheckpointer.FilePattern.fullmatch(filename)
+
+            if match and int(match.group(1)) not in generations:
+                generation = store.import_checkpoint(f'{folder}/{filename}')
+                print(f'Imported checkpoint: {folder}/{filename} ({generation})')
+
+    if args.index:
+        genome_index = GenomeIndex(f'./genome-index-{preset}')
+
+        for generation in store.get_generations() if store is not None else []:
+            if not genome_index.has_generation(generation):
+                genome_index.add_generation(generation, store.load_checkpoint(generation)[2])
+                print(f'Indexed checkpoint: {store.get_manifest_path(generation)}')
+
+        for filename in get_folder_contents(folder):
+            match = AsyncCheckpointer.FilePattern.fullmatch(filename)
+
+            if match and not genome_index.has_generation(int(match.group(1))):
+                with gzip.open(f'{folder}/{filename}') as file:
+                    genome_index.add_generation(int(match.group(1)), pickle.load(file)[2])
+
+                print(f'Indexed checkpoint: {folder}/{filename}')
+
+    if args.export is not None:
+        if store is None:
+            raise Exception("No checkpoint store available.")
+
+        if not os.path.isdir(folder):
+            os.mkdir(folder)
+
+        store.export_checkpoint(args.export, f'{folder}/checkpoint-{args.export}')
+        print(f'Exported checkpoint: {folder}/checkpoint-{args.export}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+import argparse
+
+from distributed_pool import run_worker, parse_address
+from shared import print_signature, get_process_count
+
+
+def main():
+    print_signature("Worker Script")
+
+    parser = argparse.ArgumentParser(description="Plays the games served by a distributed evolution coordinator.")
+
+    parser.add_argument(
+        '-a',
+        '--address',
+        dest='address',
+        metavar='HOST:PORT',
+        type=str,
+        help='the address of the evolution coordinator',
+        required=True
+    )
+
+    parser.add_argument(
+        '-n',
+        '--processes',
+        dest='processes',
+        metavar='N',
+        type=int,
+        default=get_process_count(),
+        help='the number of local processes that play games'
+    )
+
+    args = parser.parse_args()
+
+    print(f'Selected coordinator: {args.address}')
+    print(f'Selected processes: {args.processes}')
+
+    run_worker(parse_address(args.address), args.processes)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,35 @@
 import argparse
+import itertools
 import json
 import os
 import re
 from argparse import Namespace
-from multiprocessing import Pool, Lock, Manager, Value
-from multiprocessing.queues import Queue
-from typing import Dict, Tuple, List
+from multiprocessing import Pool
+from typing import Dict, Tuple, List, Iterable, Optional, Union, TYPE_CHECKING
 
 from neat import Checkpointer, Population, StdOutReporter, StatisticsReporter, DefaultGenome, Config
-from neat.nn import FeedForwardNetwork
 
+from batch_game import BatchGame
+from checkpoint_store import CheckpointStore
+from checkpoint_writer import CheckpointWriter, AsyncCheckpointer
+from compiled_network import CompiledNetwork, BatchNetwork
+from distributed_pool import DistributedPool, parse_address
+from early_stop import EarlyStop
+from episode_pool import EpisodePool
+from fitness_cache import FitnessCache
 from game import Game
-from game_map import GameMap
+from game_episode import GameEpisode
+from game_move import GameMove
+from game_profiler import GameProfiler
 from game_presets import BlueBeatRedEasy, BlueBeatRedHard, BlueExpandAlone, BlueAgainstRed
 from game_result import GameResult
+from game_snapshot import GameSnapshot
+from genome_index import GenomeIndex
+from results_store import ResultsStore
+from successive_halving import SuccessiveHalving
+
+if TYPE_CHECKING:
+    from game_map import GameMap
 
 
 def print_signature(title):
@@ -26,7 +42,7 @@ def print_signature(title):
     print()
 
 
-def parse_args(description) -> Namespace:
+def parse_args(description, evolution: bool = False, stats: bool = False) -> Namespace:
     parser = argparse.ArgumentParser(description=description)
 
     parser.add_argument(
@@ -39,24 +55,125 @@ def parse_args(description) -> Namespace:
         required=True
     )
 
+    if evolution:
+        parser.add_argument(
+            '-b',
+            '--batch',
+            dest='batch',
+            action='store_true',
+            help='play the games of each worker in lockstep batches'
+        )
+
+        parser.add_argument(
+            '-c',
+            '--cache',
+            dest='cache',
+            action='store_true',
+            help='reuse the game results of genomes that were already evaluated'
+        )
+
+        parser.add_argument(
+            '--profile',
+            dest='profile',
+            action='store_true',
+            help='record the time spent in each phase of the game loop'
+        )
+
+        parser.add_argument(
+            '--stall-rounds',
+            dest='stall_rounds',
+            metavar='K',
+            type=int,
+            default=0,
+            help='stop games whose tile and troop counts have not changed for K rounds'
+        )
+
+        parser.add_argument(
+            '--cutoff-quantile',
+            dest='cutoff_quantile',
+            metavar='Q',
+            type=float,
+            default=None,
+            help='stop games that can no longer reach this fitness quantile of the previous generation'
+        )
+
+        parser.add_argument(
+            '--store',
+            dest='store',
+            action='store_true',
+            help='save checkpoints to the deduplicated checkpoint store'
+        )
+
+        parser.add_argument(
+            '--index',
+            dest='index',
+            action='store_true',
+            help='index the genomes of every generation for random access'
+        )
+
+        parser.add_argument(
+            '--coordinator',
+            dest='coordinator',
+            metavar='HOST:PORT',
+            type=str,
+            default=None,
+            help='serve the games to remote workers on this address instead of the local pool'
+        )
+
+    if stats:
+        parser.add_argument(
+            '-f',
+            '--follow',
+            dest='follow',
+            action='store_true',
+            help='keep updating the plots while new generations are written'
+        )
+
     args = parser.parse_args()
 
     print(f'Selected game preset: {args.preset}')
 
+    if evolution and args.batch:
+        print(f'Selected batch evaluation')
+
+    if evolution and args.cache:
+        print(f'Selected fitness cache')
+
+    if evolution and args.profile:
+        print(f'Selected game profiling')
+
+    if evolution and args.stall_rounds > 0:
+        print(f'Selected early stop after {args.stall_rounds} stalled rounds')
+
+    if evolution and args.cutoff_quantile is not None:
+        print(f'Selected early stop below the {args.cutoff_quantile} fitness quantile')
+
+    if evolution and args.store:
+        print(f'Selected checkpoint store')
+
+    if evolution and args.index:
+        print(f'Selected genome index')
+
+    if evolution and args.coordinator is not None:
+        print(f'Selected distributed evaluation on {args.coordinator}')
+
+    if stats and args.follow:
+        print(f'Selected follow mode')
+
     return args
 
 
-def game_setup(preset: int) -> Game:
+def game_setup(preset: int, headless: bool = False) -> Game:
     if preset == 1:
-        return BlueBeatRedEasy()
+        return BlueBeatRedEasy(headless)
     elif preset == 2:
-        return BlueBeatRedHard()
+        return BlueBeatRedHard(headless)
     elif preset == 3:
-        return BlueExpandAlone()
+        return BlueExpandAlone(headless)
     elif preset == 4:
-        return BlueAgainstRed()
+        return BlueAgainstRed(headless)
     else:
-        return Game()
+        return Game(headless)
 
 
 def get_folder_contents(path) -> List[str]:
@@ -67,22 +184,53 @@ def get_folder_contents(path) -> List[str]:
     return files
 
 
-def pop_setup(neat_config: Config, preset: int, ckp_number: int = None) -> Population:
+checkpoint_writer = None  # type: CheckpointWriter
+
+
+def get_checkpoint_writer() -> CheckpointWriter:
+    global checkpoint_writer
+
+    if checkpoint_writer is None:
+        checkpoint_writer = CheckpointWriter()
+
+    # Checkpoints still being written from an earlier population must land before the folders are listed.
+    checkpoint_writer.flush()
+    return checkpoint_writer
+
+
+def pop_setup(neat_config: Config, preset: int, ckp_number: int = None, use_store: bool = False,
+              use_index: bool = False) -> Population:
     folder = f'./checkpoints-{preset}'
     filename = f'checkpoint-{ckp_number}'
+    store_folder = f'./checkpoint-store-{preset}'
+    index_folder = f'./genome-index-{preset}'
+
+    # Once a checkpoint store exists it is preferred, the pickle checkpoints stay readable as a fallback.
+    writer = get_checkpoint_writer()
+    store = CheckpointStore(store_folder, writer) if use_store or os.path.isdir(store_folder) else None
+    store_list = store.get_generations() if store is not None else []
 
     if ckp_number:
-        ckp_file = f'{folder}/{filename}'
-        pop = Checkpointer.restore_checkpoint(ckp_file)
-        print(f'Loaded predefined checkpoint: {ckp_file}')
+        if ckp_number in store_list:
+            pop = store.restore_checkpoint(ckp_number)
+            print(f'Loaded predefined checkpoint: {store.get_manifest_path(ckp_number)}')
+        else:
+            ckp_file = f'{folder}/{filename}'
+            pop = Checkpointer.restore_checkpoint(ckp_file)
+            print(f'Loaded predefined checkpoint: {ckp_file}')
     else:
 
         if not os.path.isdir(folder):
             os.mkdir(folder)
 
-        ckp_list = get_folder_contents(f'{folder}')
+        # Temporary files of checkpoints that are still being written are never picked up.
+        ckp_list = [filename for filename in get_folder_contents(f'{folder}')
+                    if AsyncCheckpointer.FilePattern.fullmatch(filename)]
 
-        if len(ckp_list) > 0:
+        if len(store_list) > 0:
+            pop = store.restore_checkpoint(store_list[-1])
+            print(f'Loaded checkpoint: {store.get_manifest_path(store_list[-1])}')
+        elif len(ckp_list) > 0:
             ckp_file = f'{folder}/{ckp_list[-1]}'
             pop = Checkpointer.restore_checkpoint(ckp_file)
             print(f'Loaded checkpoint: {ckp_file}')
@@ -92,18 +240,86 @@ def pop_setup(neat_config: Config, preset: int, ckp_number: int = None) -> Popul
 
     pop.add_reporter(StdOutReporter(True))
     pop.add_reporter(StatisticsReporter())
-    pop.add_reporter(Checkpointer(generation_interval=1, filename_prefix=f'{folder}/checkpoint-'))
+
+    # The index keeps its own copy of every genome, so it is only extended once it was asked for.
+    if use_index or os.path.isdir(index_folder):
+        pop.add_reporter(GenomeIndex(index_folder, writer))
+
+    if store is not None:
+        pop.add_reporter(store)
+    else:
+        pop.add_reporter(AsyncCheckpointer(writer, generation_interval=1, filename_prefix=f'{folder}/checkpoint-'))
 
     return pop
 
 
-def evaluate_fitness(preset: int, generation: int, genomes: List[Tuple[int, DefaultGenome]], config: Config) -> None:
-    pool = Pool(max(os.cpu_count() - 1, 1))
-    manager = Manager()
-    lock = manager.Lock()
-    queue = manager.Queue()
-    counter = manager.Value('i', 0)
+worker_config = None  # type: Config
+worker_games = {}  # type: Dict[int, Game]
+worker_batches = {}  # type: Dict[Tuple[int, int], BatchGame]
+worker_profiler = None  # type: GameProfiler
+worker_episodes = None  # type: EpisodePool
+worker_dtype = 'float64'
+
+
+def worker_setup(config: Config, profile: bool = False, episode_pool: EpisodePool = None,
+                 network_dtype: str = 'float64') -> None:
+    global worker_config, worker_profiler, worker_episodes, worker_dtype
+    worker_config = config
+    worker_episodes = episode_pool
+    worker_dtype = network_dtype
+
+    if profile:
+        worker_profiler = GameProfiler()
+        worker_profiler.instrument_networks()
+        worker_profiler.instrument_moves()
+
+
+def get_worker_game(preset: int) -> Game:
+    if preset not in worker_games:
+        worker_games[preset] = game_setup(preset, headless=True)
+
+        if worker_profiler is not None:
+            worker_profiler.instrument_game(worker_games[preset])
+
+    return worker_games[preset]
 
+
+def get_worker_batch(preset: int, size: int) -> BatchGame:
+    if (preset, size) not in worker_batches:
+        worker_batches[(preset, size)] = BatchGame(game_setup(preset, headless=True), size)
+
+        if worker_profiler is not None:
+            worker_profiler.instrument_batch(worker_batches[(preset, size)])
+
+    return worker_batches[(preset, size)]
+
+
+def get_worker_episodes(preset: int) -> Optional[EpisodePool]:
+    return worker_episodes if worker_episodes is not None and worker_episodes.preset == preset else None
+
+
+def get_process_count() -> int:
+    return max(os.cpu_count() - 1, 1)
+
+
+def get_worker_profile(games: int) -> Optional[Dict]:
+    return worker_profiler.collect(games) if worker_profiler is not None else None
+
+
+def pool_setup(config: Config, profile: bool = False, episode_pool: EpisodePool = None,
+               coordinator: str = None, network_dtype: str = 'float64') -> Union[Pool, DistributedPool]:
+    if coordinator is not None:
+        return DistributedPool(parse_address(coordinator), (config, profile, episode_pool, network_dtype))
+
+    # The episode maps are created once here and shipped to every worker with the initializer.
+    return Pool(get_process_count(), initializer=worker_setup,
+                initargs=(config, profile, episode_pool, network_dtype))
+
+
+def evaluate_fitness(pool: Union[Pool, DistributedPool], preset: int, generation: int,
+                     genomes: List[Tuple[int, DefaultGenome]], batch: bool = False, fitness_cache: FitnessCache = None,
+                     game_profiler: GameProfiler = None, early_stop: EarlyStop = None,
+                     successive_halving: SuccessiveHalving = None) -> None:
     gr_folder = f'./game-results-{preset}'
 
     if not os.path.isdir(gr_folder):
@@ -112,19 +328,46 @@ def evaluate_fitness(preset: int, generation: int, genomes: List[Tuple[int, Defa
     if os.path.exists(f'{gr_folder}/game-result-{generation}.json'):
         os.remove(f'{gr_folder}/game-result-{generation}.json')
 
-    pool.starmap(process_game, [
-        [preset, genome, config, lock, queue, counter] for genome_id, genome in genomes
-    ])
+    genome_dict = dict(genomes)
+    cached_results = []
+
+    if fitness_cache is not None:
+        for genome_id, genome in genomes:
+            game_result = fitness_cache.get(genome)
+
+            if game_result is not None:
+                cached_results.append(game_result)
+
+        cached_keys = set(game_result.genome_key for game_result in cached_results)
+        genomes = [(genome_id, genome) for genome_id, genome in genomes if genome_id not in cached_keys]
+
+    if successive_halving is not None:
+        results = play_halving(pool, preset, genomes, batch, game_profiler, early_stop, successive_halving)
+    else:
+        results = play_results(pool, preset, genomes, batch, game_profiler, early_stop)
 
     gs_list = []
     gs_json = []
 
-    while not queue.empty():
-        game_result = queue.get()  # type: GameResult
+    for counter, game_result in enumerate(itertools.chain(cached_results, results), start=1):  # type: int, GameResult
+        print(f'{counter:>3}. {game_result}')
         gs_list.append(game_result)
         gs_json.append(vars(game_result))
-        genome = list(filter(lambda item: item[0] == game_result.genome_key, genomes))[0][1]
-        genome.fitness = game_result.fitness
+        genome_dict[game_result.genome_key].fitness = game_result.fitness
+
+    if fitness_cache is not None:
+        for game_result in gs_list:
+            if game_result.skipped_rounds == 0:
+                fitness_cache.put(genome_dict[game_result.genome_key], game_result)
+
+        fitness_cache.save()
+        print(f'Fitness cache: {len(cached_results)} cached, {len(genomes)} played')
+
+    if early_stop is not None:
+        stopped = [game_result for game_result in gs_list if game_result.skipped_rounds > 0]
+        skipped_rounds = sum(game_result.skipped_rounds for game_result in stopped)
+        print(f'Early stop: {len(stopped)} games stopped, {skipped_rounds} rounds skipped')
+        early_stop.update_cutoff([game_result.fitness for game_result in gs_list])
 
     gs_json.sort(key=lambda game_json: (game_json['fitness']), reverse=True)
 
@@ -133,30 +376,226 @@ def evaluate_fitness(preset: int, generation: int, genomes: List[Tuple[int, Defa
         with open(f'{gr_folder}/game-result-{number}.json', 'w') as file:
             json.dump(gs_json, file, indent=2)
 
+        gs_list.sort(key=lambda game_result: game_result.fitness, reverse=True)
+        ResultsStore(f'./results-store-{preset}').append(number, gs_list)
+
     print()
 
 
-def process_game(preset: int, genome: DefaultGenome, config: Config, lock: Lock, queue: Queue, counter: Value) -> None:
-    game = game_setup(preset)
-    play_game(genome, config, game, False)
-    game_result = GameResult(genome, game)
+def play_results(pool: Union[Pool, DistributedPool], preset: int, genomes: List[Tuple[int, DefaultGenome]],
+                 batch: bool = False, game_profiler: GameProfiler = None, early_stop: EarlyStop = None,
+                 game_snapshots: Dict[int, List[GameSnapshot]] = None,
+                 paused_snapshots: Dict[int, List[GameSnapshot]] = None) -> Iterable[GameResult]:
+    def get_snapshots(genome: DefaultGenome) -> Optional[List[GameSnapshot]]:
+        return game_snapshots[genome.key] if game_snapshots else None
+
+    if batch:
+        processes = get_process_count()
+        chunks = [genomes[index::processes] for index in range(processes)]
+        jobs = [
+            (preset, [genome for genome_id, genome in chunk], early_stop,
+             [get_snapshots(genome) for genome_id, genome in chunk] if game_snapshots else None)
+            for chunk in chunks if chunk
+        ]
+        outputs = pool.imap_unordered(process_games, jobs)
+    else:
+        jobs = [(preset, genome, early_stop, get_snapshots(genome)) for genome_id, genome in genomes]
+        outputs = (
+            ([game_result], profile, snapshots)
+            for game_result, profile, snapshots in pool.imap_unordered(process_game, jobs)
+        )
+
+    return receive_results(outputs, game_profiler, paused_snapshots)
+
+
+def play_halving(pool: Union[Pool, DistributedPool], preset: int, genomes: List[Tuple[int, DefaultGenome]],
+                 batch: bool, game_profiler: GameProfiler, early_stop: EarlyStop,
+                 successive_halving: SuccessiveHalving) -> Iterable[GameResult]:
+    max_rounds = game_setup(preset, headless=True).get_max_rounds()
+    game_snapshots = {}
+
+    # The genomes that continue resume their paused games from the saved state up to the next horizon.
+    for horizon in successive_halving.get_horizons(max_rounds):
+        rung_stop = successive_halving.create_early_stop(early_stop, horizon)
+        paused_snapshots = {}
+        game_results = list(play_results(pool, preset, genomes, batch, game_profiler, rung_stop,
+                                         game_snapshots, paused_snapshots))
+
+        if horizon >= max_rounds:
+            yield from game_results
+            return
+
+        eliminated, kept_keys = successive_halving.select(game_results, set(paused_snapshots))
+        game_snapshots = {key: paused_snapshots[key] for key in kept_keys}
+        print(f'Successive halving: {len(game_results)} played to {horizon} rounds, {len(kept_keys)} continue')
 
-    lock.acquire()
-    counter.value += 1
-    print(f'{counter.value:>3}. {game_result}')
-    lock.release()
+        yield from eliminated
 
-    queue.put(game_result)
+        kept_keys = set(kept_keys)
+        genomes = [(genome_id, genome) for genome_id, genome in genomes if genome.key in kept_keys]
 
+        if len(genomes) == 0:
+            return
 
-def play_game(genome: DefaultGenome, config: Config, game: Game, render: bool, game_map: GameMap = None) -> None:
+
+def receive_results(outputs: Iterable[Tuple[List[GameResult], Optional[Dict], Dict[int, List[GameSnapshot]]]],
+                    game_profiler: GameProfiler = None,
+                    paused_snapshots: Dict[int, List[GameSnapshot]] = None) -> Iterable[GameResult]:
+    for game_results, profile, snapshots in outputs:
+        if game_profiler is not None and profile is not None:
+            game_profiler.merge(profile)
+
+        if paused_snapshots is not None:
+            paused_snapshots.update(snapshots)
+
+        yield from game_results
+
+
+def get_paused_snapshots(genome_key: int, game_snapshots: List[GameSnapshot]) -> Dict[int, List[GameSnapshot]]:
+    # Only genomes with a game paused at the horizon can continue, their other episodes are kept to resume together.
+    return {genome_key: game_snapshots} if any(snapshot.paused for snapshot in game_snapshots) else {}
+
+
+def process_game(job: Tuple[int, DefaultGenome, EarlyStop, Optional[List[GameSnapshot]]]) \
+        -> Tuple[GameResult, Optional[Dict], Dict[int, List[GameSnapshot]]]:
+    preset, genome, early_stop, snapshots = job
+    game = get_worker_game(preset)
+    episode_pool = get_worker_episodes(preset)
+    episodes = episode_pool.episodes if episode_pool is not None else [None]
+    snapshots = snapshots if snapshots is not None else [None] * len(episodes)
+    pausing = early_stop is not None and early_stop.horizon is not None
+    game_results = []
+    game_snapshots = []
+
+    for episode, snapshot in zip(episodes, snapshots):
+        play_game(genome, worker_config, game, False, early_stop=early_stop, episode=episode,
+                  network_dtype=worker_dtype, snapshot=snapshot)
+        game_results.append(GameResult(genome, game))
+
+        if pausing:
+            game_snapshots.append(game.get_snapshot(*early_stop.get_state()))
+
+    game_snapshots = get_paused_snapshots(genome.key, game_snapshots) if pausing else {}
+
+    if episode_pool is None:
+        return game_results[0], get_worker_profile(1), game_snapshots
+
+    return episode_pool.aggregate_results(game_results), get_worker_profile(len(game_results)), game_snapshots
+
+
+def process_games(job: Tuple[int, List[DefaultGenome], EarlyStop, Optional[List[List[GameSnapshot]]]]) \
+        -> Tuple[List[GameResult], Optional[Dict], Dict[int, List[GameSnapshot]]]:
+    preset, genomes, early_stop, snapshots = job
+    episode_pool = get_worker_episodes(preset)
+    episodes = episode_pool.episodes if episode_pool is not None else None
+    count = len(episodes) if episodes is not None else 1
+    snapshots = [snapshot for genome_snapshots in snapshots for snapshot in genome_snapshots] if snapshots is not None else None
+
+    # Every genome plays all episodes side by side, one batch row per genome and episode.
+    batch = get_worker_batch(preset, len(genomes) * count)
+    play_games(genomes, worker_config, batch, early_stop, episodes, worker_dtype, snapshots)
+    episode_results = batch.get_results([genome.key for genome in genomes for _ in range(count)])
+    game_snapshots = {}
+
+    if early_stop is not None and early_stop.horizon is not None:
+        for index, genome in enumerate(genomes):
+            game_snapshots.update(get_paused_snapshots(genome.key, [
+                batch.get_snapshot(row, *early_stop.get_batch_state(row))
+                for row in range(index * count, (index + 1) * count)
+            ]))
+
+    if episode_pool is None:
+        return episode_results, get_worker_profile(len(genomes)), game_snapshots
+
+    game_results = [
+        episode_pool.aggregate_results(episode_results[index * count:(index + 1) * count])
+        for index in range(len(genomes))
+    ]
+
+    return game_results, get_worker_profile(len(genomes) * count), game_snapshots
+
+
+def play_games(genomes: List[DefaultGenome], config: Config, batch: BatchGame, early_stop: EarlyStop = None,
+               episodes: List[GameEpisode] = None, network_dtype: str = 'float64',
+               snapshots: List[GameSnapshot] = None) -> None:
+    count = len(episodes) if episodes is not None else 1
+    batch.reset_game([episode for _ in genomes for episode in episodes] if episodes is not None else None)
+
+    if early_stop is not None:
+        early_stop.reset()
+
+    # Resumed games continue from their saved state, games that were not paused stay ended.
+    if snapshots is not None:
+        batch.load_snapshots(snapshots)
+        early_stop.load_batch_state(snapshots)
+
+        if batch.has_ended():
+            return
+
+    networks = [CompiledNetwork.create(genome, config, network_dtype) for genome in genomes]
+    network = BatchNetwork.create([network for network in networks for _ in range(count)])
+
+    batch.increase_round()
+
+    while True:
+        batch.player_id = Game.BluePlayer
+        play_batch_move(network, batch)
+        batch.end_games()
+
+        if batch.has_ended():
+            break
+
+        batch.player_id = Game.RedPlayer
+
+        if batch.game.is_red_simulated():
+            play_batch_simulated(batch)
+            batch.end_games()
+
+            if batch.has_ended():
+                break
+
+        if early_stop is not None:
+            batch.stop_games(early_stop.should_stop_batch(batch))
+
+            if batch.has_ended():
+                break
+
+        batch.increase_round()
+
+
+def play_batch_move(network: BatchNetwork, batch: BatchGame) -> None:
+    moves = batch.decode_moves(network.activate(batch.get_inputs()))
+    batch.guide_moves(moves)
+    batch.record_rewards(moves)
+    batch.play_moves(*moves)
+
+
+def play_batch_simulated(batch: BatchGame) -> None:
+    move_types, sources, targets, troops, guided = batch.simulate_moves()
+    batch.play_moves(move_types, sources, targets, troops)
+
+
+def play_game(genome: DefaultGenome, config: Config, game: Game, render: bool, game_map: 'GameMap' = None,
+              early_stop: EarlyStop = None, episode: GameEpisode = None, network_dtype: str = 'float64',
+              snapshot: GameSnapshot = None) -> None:
     if game_map is None:
-        game.reset_game(create_game_map=True)
+        game.reset_game(create_game_map=True, episode=episode)
     else:
         game.game_map = game_map
-        game.reset_game(create_game_map=False)
+        game.reset_game(create_game_map=False, episode=episode)
 
-    network = FeedForwardNetwork.create(genome, config)
+    if early_stop is not None:
+        early_stop.reset()
+
+    # A resumed game continues from its saved state, a game that was not paused keeps its result.
+    if snapshot is not None:
+        game.load_snapshot(snapshot)
+        early_stop.load_state(snapshot)
+
+        if not snapshot.paused:
+            return
+
+    network = CompiledNetwork.create(genome, config, network_dtype)
 
     if render:
         game.game_map.genome_id = genome.key
@@ -185,15 +624,16 @@ def play_game(genome: DefaultGenome, config: Config, game: Game, render: bool, g
             if game.has_ended():
                 break
 
+        if early_stop is not None and early_stop.should_stop(game):
+            game.skipped_rounds = game.get_max_rounds() - game.rounds
+            break
+
         game.increase_round()
 
 
-def play_simulated(game: Game) -> Dict:
+def play_simulated(game: Game) -> GameMove:
     player_move = game.state_parser.simulate_move()
-    move_type = player_move['move_type']
-    source_tile = player_move['source_tile']
-    target_tile = player_move['target_tile']
-    troops = player_move['troops']
+    move_type, source_tile, target_tile, troops, guided = player_move
 
     if move_type == Game.ProductionMove:
         game.production_move(source_tile)
@@ -206,136 +646,15 @@ def play_simulated(game: Game) -> Dict:
     return player_move
 
 
-def get_fitness(comb):
-    payoff = [
-        (-1, 0, 0, 0),
-        (0, 0, 0, 0),
-        (0, 1, 0, 0),
-        (1, 0, 0, 0),
-        (-1, -1, 0, -1),
-        (-1, -2, 0, -2),
-        (-1, -3, 0, -3),
-        (-1, -4, 0, -4),
-        (-1, -5, 0, -5),
-        (-1, -6, 0, -6),
-        (-1, -7, 0, -7),
-        (-1, -8, 0, -8),
-        (-1, -9, 0, -9),
-        (-1, -10, 0, -10),
-        (-1, -11, 0, -11),
-        (-1, -12, 0, -12),
-        (-1, -13, 0, -13),
-        (-1, -14, 0, -14),
-        (-1, -15, 0, -15),
-        (-1, -16, 0, -16),
-        (-1, -17, 0, -17),
-        (-1, -18, 0, -18),
-        (-1, -19, 0, -19),
-        (0, -1, 0, -1),
-        (0, -2, 0, -2),
-        (0, -3, 0, -3),
-        (0, -4, 0, -4),
-        (0, -5, 0, -5),
-        (0, -6, 0, -6),
-        (0, -7, 0, -7),
-        (0, -8, 0, -8),
-        (0, -9, 0, -9),
-        (0, -10, 0, -10),
-        (0, -11, 0, -11),
-        (0, -12, 0, -12),
-        (0, -13, 0, -13),
-        (0, -14, 0, -14),
-        (0, -15, 0, -15),
-        (0, -16, 0, -16),
-        (0, -17, 0, -17),
-        (0, -18, 0, -18),
-        (0, -19, 0, -19),
-        (0, -1, -1, -1),
-        (0, -2, -1, -2),
-        (0, -3, -1, -3),
-        (0, -4, -1, -4),
-        (0, -5, -1, -5),
-        (0, -6, -1, -6),
-        (0, -7, -1, -7),
-        (0, -8, -1, -8),
-        (0, -9, -1, -9),
-        (0, -10, -1, -10),
-        (0, -11, -1, -11),
-        (0, -12, -1, -12),
-        (0, -13, -1, -13),
-        (0, -14, -1, -14),
-        (0, -15, -1, -15),
-        (0, -16, -1, -16),
-        (0, -17, -1, -17),
-        (0, -18, -1, -18),
-        (0, -19, -1, -19),
-        (-1, -1, -1, -1),
-        (-1, -2, -1, -2),
-        (-1, -3, -1, -3),
-        (-1, -4, -1, -4),
-        (-1, -5, -1, -5),
-        (-1, -6, -1, -6),
-        (-1, -7, -1, -7),
-        (-1, -8, -1, -8),
-        (-1, -9, -1, -9),
-        (-1, -10, -1, -10),
-        (-1, -11, -1, -11),
-        (-1, -12, -1, -12),
-        (-1, -13, -1, -13),
-        (-1, -14, -1, -14),
-        (-1, -15, -1, -15),
-        (-1, -16, -1, -16),
-        (-1, -17, -1, -17),
-        (-1, -18, -1, -18),
-        (-1, -19, -1, -19),
-        (-1, -20, -1, -20),
-        (1, -1, -1, -1),
-        (1, -2, -1, -2),
-        (1, -3, -1, -3),
-        (1, -4, -1, -4),
-        (1, -5, -1, -5),
-        (1, -6, -1, -6),
-        (1, -7, -1, -7),
-        (1, -8, -1, -8),
-        (1, -9, -1, -9),
-        (1, -10, -1, -10),
-        (1, -11, -1, -11),
-        (1, -12, -1, -12),
-        (1, -13, -1, -13),
-        (1, -14, -1, -14),
-        (1, -15, -1, -15),
-        (1, -16, -1, -16),
-        (1, -17, -1, -17),
-        (1, -18, -1, -18),
-        (1, -19, -1, -19),
-    ]
-
-    payoff_dict = {}
-
-    for idx, key in enumerate(payoff):
-        payoff_dict[key] = idx + 1
-
-    return payoff_dict[comb] / len(payoff_dict)
-
-
-def play_move(network: FeedForwardNetwork, game: Game) -> Dict:
-    player_id = game.player_id
-    player = game.get_player(player_id)
-    enemy_id = Game.BluePlayer if player_id == Game.RedPlayer else Game.RedPlayer
+def play_move(network: CompiledNetwork, game: Game) -> GameMove:
+    player = game.get_player(game.player_id)
 
     output = network.activate(game.state_parser.encode_state())
     player_move = game.state_parser.decode_state(output)
 
-    move_type = player_move['move_type']
-    source_tile = player_move['source_tile']
-    target_tile = player_move['target_tile']
-    troops = player_move['troops']
-    guided = player_move['guided']
+    move_type, source_tile, target_tile, troops, guided = player_move
 
-    prev_my_tiles = game.get_tile_count(player_id)
-    prev_my_troops = game.get_troop_count(player_id)
-    prev_enemy_tiles = game.get_tile_count(enemy_id)
-    prev_enemy_troops = game.get_troop_count(enemy_id)
+    move_deltas = game.get_move_deltas(move_type, source_tile, target_tile, troops)
 
     if move_type == Game.ProductionMove:
         game.production_move(source_tile)
@@ -344,19 +663,7 @@ def play_move(network: FeedForwardNetwork, game: Game) -> Dict:
     elif move_type == Game.TransportMove:
         game.transport_move(source_tile, target_tile, troops)
 
-    after_my_tiles = game.get_tile_count(player_id)
-    after_my_troops = game.get_troop_count(player_id)
-    after_enemy_tiles = game.get_tile_count(enemy_id)
-    after_enemy_troops = game.get_troop_count(enemy_id)
-
-    comp_my_tiles = after_my_tiles - prev_my_tiles
-    comp_my_troops = after_my_troops - prev_my_troops
-    comp_enemy_tiles = after_enemy_tiles - prev_enemy_tiles
-    comp_enemy_troops = after_enemy_troops - prev_enemy_troops
-
-    move_fitness = get_fitness((comp_my_tiles, comp_my_troops, comp_enemy_tiles, comp_enemy_troops))
-
-    player.per_move_fitness.append(move_fitness)
+    player.per_move_fitness.append(game.get_reward_table().get_reward(move_deltas))
 
     if guided:
         player.guided_moves += 1
@@ -1,143 +1,104 @@
-import math
-import sys
-from typing import List, Dict, Tuple
+from typing import List, Tuple
 
+import numpy as np
+from numpy import ndarray
 
-class StateParser:
-    def __init__(self):
-        self.game = None
+from game import Game
+from game_move import GameMove
+from move_generator import MoveGenerator
+
+
+def create_bin_edges(step: float) -> List[float]:
+    lb = 0
+    edges = [lb]
 
-    def encode_state(self) -> List[int]:
-        from game import Game
+    while lb <= 1.0:
+        ub = lb + step
+        edges.append(ub)
+        lb = ub
 
-        inputs = []
+    return edges
 
-        for i in range(Game.MapWidth):
-            for j in range(Game.MapHeight):
-                tile = (i, j)
-                troops = self.game.get_tile_troops(tile)
-                owner = self.game.get_tile_owner(tile)
-                sign = 0
 
-                if owner == Game.BluePlayer:
-                    sign = 1
-                elif owner == Game.RedPlayer:
-                    sign = -1
+class StateParser:
+    Moves = MoveGenerator()
+    TileEdges = create_bin_edges(1 / (Game.MapSize - 1))
+    TroopEdges = create_bin_edges(1 / Game.TileTroopMax)
 
-                inputs.append((sign * troops) / Game.TileTroopMax)
+    def __init__(self):
+        self.game = None
 
-        return inputs
+    def encode_state(self) -> List[float]:
+        return self.game.inputs
 
     def decode_prod_flag(self, number: float) -> bool:
         return number <= 0.5
 
-    def decode_tile(self, number: float) -> Tuple[int, int]:
-        from game import Game
-
-        lb = 0
-        step = 1 / (Game.MapSize - 1)
-        idx = 0
-        tile = 0
-
-        while lb <= 1.0:
-            ub = lb + step
-            if lb <= number <= ub:
-                tile = self.game.get_tile_coords(idx)
-            lb = ub
+    @staticmethod
+    def decode_bin(number: float, edges: List[float]) -> int:
+        if not edges[0] <= number <= edges[-1]:
+            return -1
+
+        # The edges are accumulated like the original bin loop, so the arithmetic guess is corrected against them.
+        # Bins share their boundaries and the last matching bin wins.
+        last = len(edges) - 2
+        idx = min(int(number / edges[1]), last)
+
+        while idx < last and edges[idx + 1] <= number:
             idx += 1
 
-        return tile
+        while idx > 0 and number < edges[idx]:
+            idx -= 1
+
+        return idx
+
+    @staticmethod
+    def decode_bins(numbers: ndarray, edges: List[float]) -> ndarray:
+        indices = np.searchsorted(edges[:-1], numbers, side='right') - 1
+        return np.clip(indices, 0, len(edges) - 2)
+
+    def decode_tile(self, number: float) -> Tuple[int, int]:
+        idx = StateParser.decode_bin(number, StateParser.TileEdges)
+        return Game.TileCoords[idx] if idx >= 0 else 0
 
     def decode_troops(self, number: float) -> int:
-        from game import Game
-
-        lb = 0
-        step = 1 / Game.TileTroopMax
-        idx = 1
-        troops = 1
-
-        while lb <= 1.0:
-            ub = lb + step
-            if lb <= number <= ub:
-                troops = idx
-            lb = ub
-            idx += 1
+        idx = StateParser.decode_bin(number, StateParser.TroopEdges)
+        return idx + 1 if idx >= 0 else 1
 
-        return troops
+    @staticmethod
+    def decode_states(outputs: ndarray) -> Tuple[ndarray, ndarray, ndarray, ndarray]:
+        prod_flags = outputs[:, 0] <= 0.5
+        sources = StateParser.decode_bins(outputs[:, 1], StateParser.TileEdges)
+        targets = np.where(prod_flags, sources, StateParser.decode_bins(outputs[:, 2], StateParser.TileEdges))
+        troops = np.where(prod_flags, 1, StateParser.decode_bins(outputs[:, 3], StateParser.TroopEdges) + 1)
 
-    def create_move(self, move_type: int, source_tile: Tuple[int, int], target_tile: Tuple[int, int], troops: int, guided: bool) -> Dict:
-        return {
-            'move_type': move_type,
-            'source_tile': source_tile,
-            'target_tile': target_tile,
-            'troops': troops,
-            'guided': guided,
-        }
+        return prod_flags, sources, targets, troops
 
-    def get_next_moves(self) -> List[Dict]:
-        from game import Game
+    def create_move(self, move_type: int, source_tile: Tuple[int, int], target_tile: Tuple[int, int], troops: int, guided: bool) -> GameMove:
+        return GameMove(move_type, source_tile, target_tile, troops, guided)
 
-        moves = []
-        player_id = self.game.player_id
-        tiles = self.game.get_tiles(player_id)
-
-        prod_tiles = list(filter(lambda tile: self.game.is_production_move_valid(tile), tiles))
-        moves += [self.create_move(Game.ProductionMove, tile, tile, 1, True) for tile in prod_tiles]
-
-        for tile in tiles:
-            max_troops = self.game.get_tile_troops(tile) + 1
-            tiles_adj = self.game.get_tile_adj(tile)
-            attack_tiles = list(filter(lambda tile_adj: self.game.get_tile_owner(tile_adj) != player_id, tiles_adj))
-            transport_tiles = list(filter(lambda tile_adj: self.game.get_tile_owner(tile_adj) == player_id, tiles_adj))
-
-            for tile_adj in attack_tiles:
-                for troops in range(Game.TileTroopMin, max_troops):
-                    if self.game.is_attack_move_valid(tile, tile_adj, troops):
-                        moves.append(self.create_move(Game.AttackMove, tile, tile_adj, troops, True))
-
-            for tile_adj in transport_tiles:
-                for troops in range(Game.TileTroopMin, max_troops):
-                    if self.game.is_transport_move_valid(tile, tile_adj, troops):
-                        moves.append(self.create_move(Game.TransportMove, tile, tile_adj, troops, True))
-
-        return moves
-
-    def guide_move(self, player_move: Dict) -> Dict:
-        moves = self.get_next_moves()
-        best_move = None
-        distance = sys.maxsize
-
-        for possible_move in moves:
-            source_1 = self.game.get_tile_number(player_move['source_tile'])
-            target_1 = self.game.get_tile_number(player_move['target_tile'])
-            troops_1 = player_move['troops']
-            source_2 = self.game.get_tile_number(possible_move['source_tile'])
-            target_2 = self.game.get_tile_number(possible_move['target_tile'])
-            troops_2 = possible_move['troops']
-
-            calc_distance = math.sqrt(
-                ((source_1 - source_2) ** 2) + ((target_1 - target_2) ** 2) + ((troops_1 - troops_2) ** 2)
-            )
-
-            if calc_distance < distance:
-                best_move = possible_move
-                distance = calc_distance
-
-        player_move['move_type'] = best_move['move_type']
-        player_move['source_tile'] = best_move['source_tile']
-        player_move['target_tile'] = best_move['target_tile']
-        player_move['troops'] = best_move['troops']
-        player_move['guided'] = True
+    def get_legal_moves(self) -> ndarray:
+        return StateParser.Moves.get_moves(self.game)
 
-        return player_move
+    def create_legal_move(self, move: tuple) -> GameMove:
+        move_type, source, target, troops = move
+        return self.create_move(int(move_type), Game.TileCoords[source], Game.TileCoords[target], int(troops), True)
+
+    def get_next_moves(self) -> List[GameMove]:
+        return [self.create_legal_move(move) for move in self.get_legal_moves().tolist()]
+
+    def guide_move(self, player_move: GameMove) -> GameMove:
+        source = self.game.get_tile_number(player_move.source_tile)
+        target = self.game.get_tile_number(player_move.target_tile)
 
-    def simulate_move(self) -> Dict:
-        from game import Game
+        return self.create_legal_move(
+            MoveGenerator.get_nearest_move(self.get_legal_moves(), source, target, player_move.troops).tolist()
+        )
 
-        moves = self.get_next_moves()
-        production_moves = list(filter(lambda move: move['move_type'] == Game.ProductionMove, moves))
-        attack_moves = list(filter(lambda move: move['move_type'] == Game.AttackMove, moves))
-        transport_moves = list(filter(lambda move: move['move_type'] == Game.TransportMove, moves))
+    def simulate_move(self) -> GameMove:
+        moves = self.get_legal_moves()
+        production_moves = moves[moves['move_type'] == Game.ProductionMove]
+        attack_moves = moves[moves['move_type'] == Game.AttackMove]
 
         player_id = self.game.player_id
         enemy_id = Game.RedPlayer if self.game.player_id == Game.BluePlayer else Game.BluePlayer
@@ -148,15 +109,15 @@ class StateParser:
         enemy_troops = self.game.get_troop_count(enemy_id)
 
         if my_tiles < enemy_tiles and len(attack_moves) > 0:
-            return self.game.random.choice(attack_moves)
+            move = self.game.random.choice(attack_moves)
         elif (my_troops < Game.TileTroopMax or my_troops < enemy_troops) and len(production_moves) > 0:
-            return self.game.random.choice(production_moves)
+            move = self.game.random.choice(production_moves)
         else:
-            return self.game.random.choice(moves)
+            move = self.game.random.choice(moves)
 
-    def decode_state(self, output: list) -> Dict:
-        from game import Game
+        return self.create_legal_move(move.tolist())
 
+    def decode_state(self, output: list) -> GameMove:
         prod_flag = self.decode_prod_flag(output[0])
         source_tile = self.decode_tile(output[1])
 
@@ -176,13 +137,7 @@ class StateParser:
         else:
             move_type = Game.IdleMove
 
-        player_move = {
-            'move_type': move_type,
-            'source_tile': source_tile,
-            'target_tile': target_tile,
-            'troops': troops,
-            'guided': False,
-        }
+        player_move = self.create_move(move_type, source_tile, target_tile, troops, False)
 
         if move_type == Game.IdleMove:
             player_move = self.guide_move(player_move)
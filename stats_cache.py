@@ -0,0 +1,131 @@
+import json
+import os
+import re
+from typing import Dict, List
+
+import numpy as np
+from numpy import ndarray
+
+from game import Game
+from game_result import GameResult
+from results_store import ResultsStore
+
+
+class StatsCache:
+    FilePattern = re.compile(r'game-result-(\d+)\.json')
+
+    def __init__(self, preset: int):
+        self.preset = preset
+        self.path = f'./stats-cache-{preset}.json'
+        self.results_folder = f'./game-results-{preset}'
+        self.store = ResultsStore(f'./results-store-{preset}')
+        self.entries = {}  # type: Dict[int, Dict]
+        self.load()
+
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, 'r') as file:
+            self.entries = {int(generation): entry for generation, entry in json.load(file).items()}
+
+    def save(self) -> None:
+        with open(f'{self.path}.tmp', 'w') as file:
+            json.dump({str(generation): entry for generation, entry in sorted(self.entries.items())}, file)
+
+        os.replace(f'{self.path}.tmp', self.path)
+
+    def get_sources(self) -> Dict[int, List]:
+        sources = {}
+
+        if os.path.isdir(self.results_folder):
+            for filename in os.listdir(self.results_folder):
+                match = StatsCache.FilePattern.fullmatch(filename)
+
+                if match:
+                    stat = os.stat(f'{self.results_folder}/{filename}')
+                    sources[int(match.group(1))] = ['json', stat.st_mtime_ns, stat.st_size]
+
+        # Generations in the columnar store are read from there, a record only changes when it is appended again.
+        for generation, start, count in self.store.get_generations():
+            sources[int(generation)] = ['store', int(start), int(count)]
+
+        return sources
+
+    def read_results(self, generation: int, source: List) -> Dict[str, ndarray]:
+        if source[0] == 'store':
+            results = self.store.load(generation, generation + 1)
+            results['winner'] = np.array(ResultsStore.Winners)[results['winner']]
+            return results
+
+        with open(f'{self.results_folder}/game-result-{generation}.json', 'r') as file:
+            game_results = [GameResult(game_json=game_json) for game_json in json.load(file)]
+
+        return {
+            field: np.array([getattr(game_result, field) for game_result in game_results])
+            for field in ResultsStore.Fields
+        }
+
+    @staticmethod
+    def get_summary(results: Dict[str, ndarray]) -> Dict:
+        return {
+            'fitness': [
+                float(np.max(results['fitness'])),
+                float(np.mean(results['fitness'])),
+            ],
+            'tiles': [
+                float(np.mean(results['blue_tiles'])),
+                float(np.mean(Game.MapSize - (results['blue_tiles'] + results['red_tiles']))),
+                float(np.mean(results['red_tiles'])),
+            ],
+            'troops': [
+                float(np.mean(results['blue_troops'])),
+                float(np.mean(results['red_troops'])),
+            ],
+            'production': [
+                float(np.mean(results['blue_production_moves'])),
+                float(np.mean(results['red_production_moves'])),
+            ],
+            'attacks': [
+                float(np.mean(results['blue_attack_moves'])),
+                float(np.mean(results['red_attack_moves'])),
+            ],
+            'transports': [
+                float(np.mean(results['blue_transport_moves'])),
+                float(np.mean(results['red_transport_moves'])),
+            ],
+            'rounds': float(np.mean(results['rounds'])),
+            'winners': [
+                int(np.count_nonzero(results['winner'] == 'Blue')),
+                int(np.count_nonzero(results['winner'] == 'Tie')),
+                int(np.count_nonzero(results['winner'] == 'Red')),
+            ],
+            'guidance': float(np.mean(results['blue_guided_moves'])),
+        }
+
+    def update(self) -> int:
+        sources = self.get_sources()
+        updated = 0
+
+        for generation in [generation for generation in self.entries if generation not in sources]:
+            del self.entries[generation]
+            updated += 1
+
+        # Only generations whose source changed since they were summarized are read again.
+        for generation, source in sorted(sources.items()):
+            entry = self.entries.get(generation)
+
+            if entry is not None and entry['source'] == source:
+                continue
+
+            summary = StatsCache.get_summary(self.read_results(generation, source))
+            self.entries[generation] = {'source': source, 'summary': summary}
+            updated += 1
+
+        if updated > 0:
+            self.save()
+
+        return updated
+
+    def get_summaries(self) -> List[Dict]:
+        return [entry['summary'] for generation, entry in sorted(self.entries.items())]
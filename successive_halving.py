@@ -0,0 +1,61 @@
+import copy
+import math
+from configparser import ConfigParser
+from typing import List, Optional, Set, Tuple
+
+from early_stop import EarlyStop
+from game_result import GameResult
+
+
+class SuccessiveHalving:
+    Section = 'Evaluation'
+
+    def __init__(self, min_rounds: int, keep_fraction: float):
+        if min_rounds < 1:
+            raise RuntimeError(f'Expected at least one round for successive halving, got {min_rounds}')
+
+        if not 0.0 < keep_fraction < 1.0:
+            raise RuntimeError(f'Expected a keep fraction between 0 and 1 for successive halving, got {keep_fraction}')
+
+        self.min_rounds = min_rounds
+        self.keep_fraction = keep_fraction
+
+    @staticmethod
+    def load(filename: str) -> Optional['SuccessiveHalving']:
+        parser = ConfigParser()
+        parser.read(filename)
+
+        if not parser.getboolean(SuccessiveHalving.Section, 'successive_halving', fallback=False):
+            return None
+
+        min_rounds = parser.getint(SuccessiveHalving.Section, 'halving_min_rounds')
+        keep_fraction = parser.getfloat(SuccessiveHalving.Section, 'halving_keep_fraction')
+
+        return SuccessiveHalving(min_rounds, keep_fraction)
+
+    def get_horizons(self, max_rounds: int) -> List[int]:
+        horizons = []
+        horizon = self.min_rounds
+
+        while horizon < max_rounds:
+            horizons.append(horizon)
+            horizon = math.ceil(horizon / self.keep_fraction)
+
+        return horizons + [max_rounds]
+
+    @staticmethod
+    def create_early_stop(early_stop: Optional[EarlyStop], horizon: int) -> EarlyStop:
+        rung_stop = copy.copy(early_stop) if early_stop is not None else EarlyStop()
+        rung_stop.horizon = horizon
+        return rung_stop
+
+    def select(self, game_results: List[GameResult], paused_keys: Set[int]) -> Tuple[List[GameResult], List[int]]:
+        # Genomes without a paused game already have their final fitness.
+        partial = [game_result for game_result in game_results if game_result.genome_key in paused_keys]
+        final = [game_result for game_result in game_results if game_result.genome_key not in paused_keys]
+
+        # Equal partial fitness is common early in a game, the genome key keeps the selection reproducible.
+        partial.sort(key=lambda game_result: (-game_result.fitness, game_result.genome_key))
+        keep = math.ceil(len(partial) * self.keep_fraction)
+
+        return final + partial[keep:], [game_result.genome_key for game_result in partial[:keep]]